@@ -4,6 +4,8 @@ import base64
 import io
 import time
 import threading
+import asyncio
+import concurrent.futures
 import requests
 import queue
 import subprocess
@@ -11,8 +13,23 @@ import platform
 import datetime
 import re
 import os
-from typing import Optional, Dict, List, Any
-from collections import deque
+import math
+import array
+import itertools
+import socket
+import struct
+import hashlib
+import random
+import shutil
+import shlex
+import unicodedata
+import importlib
+import importlib.util
+from abc import ABC, abstractmethod
+from typing import Optional, Dict, List, Any, Iterator, Tuple
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 # Load environment variables from .env file
 try:
@@ -21,12 +38,89 @@ try:
 except ImportError:
     print("Warning: python-dotenv not installed. .env file will not be loaded.")
 
+# ============================================================================
+# LAZY IMPORTS - heavy modules load on first use (or during background warm-up)
+# ============================================================================
+
+class StartupProfiler:
+    """Collects import/initialization timings, printed with --profile-startup"""
+
+    def __init__(self):
+        self.enabled = "--profile-startup" in sys.argv
+        self.t0 = _PROCESS_START
+        self.marks = []  # (label, seconds since start)
+        self.durations = []  # (label, seconds)
+        self.first_command_done = False
+        self.lock = threading.Lock()
+
+    def mark(self, label: str):
+        """Record a milestone relative to process start"""
+        with self.lock:
+            self.marks.append((label, time.perf_counter() - self.t0))
+
+    def record(self, label: str, seconds: float):
+        """Record how long one import or engine initialization took"""
+        with self.lock:
+            self.durations.append((label, seconds))
+
+    def first_command(self):
+        """Mark time-to-first-command once and print the report"""
+        if self.first_command_done:
+            return
+        self.first_command_done = True
+        self.mark("first command answered")
+        self.report()
+
+    def report(self):
+        """Print the timing breakdown"""
+        if not self.enabled:
+            return
+        with self.lock:
+            print("\n=== Startup profile ===")
+            for label, seconds in self.marks:
+                print(f"  {label:<40} {seconds * 1000:8.0f} ms after start")
+            for label, seconds in sorted(self.durations, key=lambda item: -item[1]):
+                print(f"  {label:<40} {seconds * 1000:8.0f} ms")
+
+
+_PROCESS_START = time.perf_counter()
+PROFILER = StartupProfiler()
+_lazy_import_lock = threading.RLock()
+
+
+class LazyModule:
+    """Module proxy that imports the real module on first attribute access"""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            with _lazy_import_lock:
+                if self._module is None:
+                    started = time.perf_counter()
+                    module = importlib.import_module(self._name)
+                    PROFILER.record(f"import {self._name}", time.perf_counter() - started)
+                    self._module = module
+        return self._module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+
+def module_available(name: str) -> bool:
+    """Check a module is installed without importing it"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
 # Import Gemini
-try:
-    import google.generativeai as genai
-    GEMINI_AVAILABLE = True
-except ImportError:
-    GEMINI_AVAILABLE = False
+genai = LazyModule("google.generativeai")
+GEMINI_AVAILABLE = module_available("google.generativeai")
+if not GEMINI_AVAILABLE:
     print("Warning: google-generativeai not installed. Gemini will not be available.")
 
 # PyQt6 imports
@@ -46,27 +140,36 @@ from PyQt6.QtGui import (
 )
 
 # Audio and speech imports
-try:
-    import speech_recognition as sr
-    SPEECH_AVAILABLE = True
-except ImportError:
-    SPEECH_AVAILABLE = False
+sr = LazyModule("speech_recognition")
+SPEECH_AVAILABLE = module_available("speech_recognition")
+if not SPEECH_AVAILABLE:
     print("Warning: speech_recognition not available")
 
-try:
-    import pyaudio
-    AUDIO_AVAILABLE = True
-except ImportError:
-    AUDIO_AVAILABLE = False
+pyaudio = LazyModule("pyaudio")
+AUDIO_AVAILABLE = module_available("pyaudio")
+if not AUDIO_AVAILABLE:
     print("Warning: pyaudio not available")
 
-try:
-    import pyttsx3
-    TTS_AVAILABLE = True
-except ImportError:
-    TTS_AVAILABLE = False
+websocket = LazyModule("websocket")  # websocket-client, for streaming ASR
+WEBSOCKET_AVAILABLE = module_available("websocket")
+if not WEBSOCKET_AVAILABLE:
+    print("Warning: websocket-client not available. Streaming ASR (deepgram) disabled")
+
+aiohttp = LazyModule("aiohttp")  # Async HTTP client for the request engine
+AIOHTTP_AVAILABLE = module_available("aiohttp")
+if not AIOHTTP_AVAILABLE:
+    print("Warning: aiohttp not available. Async engine will run HTTP calls on worker threads")
+
+pyttsx3 = LazyModule("pyttsx3")
+TTS_AVAILABLE = module_available("pyttsx3")
+if not TTS_AVAILABLE:
     print("Warning: pyttsx3 not available")
 
+np = LazyModule("numpy")
+NUMPY_AVAILABLE = module_available("numpy")
+if not NUMPY_AVAILABLE:
+    print("Warning: numpy not available")
+
 try:
     import requests
     REQUESTS_AVAILABLE = True
@@ -74,14 +177,14 @@ except ImportError:
     REQUESTS_AVAILABLE = False
     print("Warning: requests not available")
 
-try:
-    from pydub import AudioSegment
-    from pydub.playback import play
-    PYDUB_AVAILABLE = True
-except ImportError:
-    PYDUB_AVAILABLE = False
+pydub = LazyModule("pydub")
+pydub_playback = LazyModule("pydub.playback")
+PYDUB_AVAILABLE = module_available("pydub")
+if not PYDUB_AVAILABLE:
     print("Warning: pydub not available")
 
+PROFILER.mark("module imports done")
+
 
 # ============================================================================
 # CONFIGURATION - API KEYS LOADED FROM .env FILE
@@ -102,16 +205,88 @@ CONFIG = {
     "openweather_api_key": os.getenv("OPENWEATHER_API_KEY", ""),
     "newsapi_key": os.getenv("NEWSAPI_KEY", ""),
     
+    # Gemini settings
+    "gemini_model": "gemini-2.5-flash",
+    "gemini_api_base": "https://generativelanguage.googleapis.com/v1beta",
+    "gemini_use_sdk": True,  # SDK cannot target a custom endpoint (e.g. offline stub)
+    "stream_responses": True,  # Show Gemini reply token-by-token as it arrives
+    "conversation_memory": True,  # Send recent turns + a rolling summary so follow-ups work
+    "context_token_budget": 1500,  # Recent turns kept verbatim (approx. tokens)
+    "summary_token_budget": 300,  # Cap on the rolling summary of older turns
+    "gemini_deadline": 30,  # Seconds for a whole request, all attempts included
+    "gemini_attempt_timeout": 12,  # Seconds for one attempt
+    "gemini_retries": 2,  # Extra attempts on 429/5xx/timeouts, with jittered exponential backoff
+    "gemini_backoff": 0.5,  # Base backoff in seconds (doubles each retry)
+    "gemini_hedge_delay": 2.0,  # Non-streamed calls: start REST if the SDK is slower; None = SDK then REST
+    "gemini_breaker_failures": 5,  # Consecutive failed requests before failing fast
+    "gemini_breaker_reset": 30,  # Seconds to fail fast before letting one trial request through
+    "async_engine": True,  # LLM/TTS/ASR requests run as cancellable tasks on one asyncio loop thread
+    "async_pool_size": 16,  # Shared aiohttp connection pool size
+    "ai_max_concurrent": 2,  # AI calls in flight at once (superseded turns keep a slot until they stop)
+    "response_cache": True,  # Reuse answers to repeated questions instead of calling Gemini again
+    "response_cache_items": 256,
+    "response_cache_ttl": 24 * 3600,  # Seconds an answer stays valid
+    "response_cache_volatile_ttl": 600,  # Shorter TTL for weather/news/prices and similar
+    "response_cache_fuzzy": 0,  # Word-overlap (Jaccard) to reuse a question differing only in stop words; 0 = exact only
+    "response_cache_file": "astra_response_cache.json",  # Relative to app folder; "" = memory only
+    "command_log_file": "astra_command_log.jsonl",  # Relative to app folder; "" = memory only
+    "command_log_items": 500,  # Most recent commands kept in memory (and shown in Logs)
+    "command_log_max_bytes": 1_000_000,  # Rotate the log file past this size...
+    "command_log_max_days": 7,  # ...or once its oldest record is this many days old
+    "command_log_backups": 3,  # Rotated files kept (.1 is the newest)
+    "command_log_flush_seconds": 2.0,  # Batch writes to disk this often
+
     "murf_voice_id": "en-US-terrell",
     "murf_api_url": "https://api.murf.ai/v1/speech/generate",
+    "murf_inline_audio": True,  # Ask for base64 audio in the JSON reply (one request per utterance)
 
     # TTS Settings - Murf only
     "use_murf_tts": True,  # Murf TTS is mandatory
+    "tts_workers": 3,  # Concurrent Murf requests when speaking sentence-by-sentence
+    "tts_cache_dir": "astra_tts_cache",  # Relative to app folder
+    "tts_cache_memory_items": 64,
+    "tts_cache_disk_mb": 50,
 
     # STT Settings
-    "stt_engine": "google",  # google, sphinx
+    "stt_engine": "google",  # google, sphinx (offline), stub - see STT_BACKENDS
+    "stt_stub_transcripts": ["hey astra what time is it"],  # Replayed in order by the stub engine
+    "deepgram_url": "wss://api.deepgram.com/v1/listen",
+    "stt_hedge": False,  # Race two engines on the same audio, first confident answer wins
+    "stt_hedge_backends": ["google", "sphinx"],  # Primary first; the second starts after the delay
+    "stt_hedge_delay": 0.5,  # Seconds to wait for the primary before starting the hedge (0 = race)
+    "stt_hedge_min_confidence": 0.5,  # Results below this keep waiting for the other engine
     "listening_timeout": 5,
     "phrase_time_limit": 10,
+    "capture_mode": "ring",  # ring = one always-open mic stream + ring buffer, legacy = reopen per phrase
+    "mic_ring_seconds": 30,  # Audio kept in the ring buffer while phrases are being recognized
+
+    # Voice activity detection (endpointing)
+    "vad_hangover_ms": 200,  # Silence after speech that ends the phrase
+    "vad_min_energy": 300,  # RMS floor (int16) for speech
+    "vad_energy_ratio": 3.0,  # Speech must be this many times louder than the noise floor
+    "vad_min_speech_ms": 120,  # Clips with less voiced audio are never uploaded
+    "vad_max_zcr": 0.3,  # Zero-crossing rate above which a frame counts as hiss (white noise ~0.5, vowels ~0.05-0.15)
+
+    # On-device wake word spotting (gates cloud ASR once templates are enrolled)
+    "wake_word_gating": True,
+    "wake_word_templates": "astra_wakeword.npz",  # Relative to app folder; create with --enroll-wake-word
+    "wake_word_threshold": None,  # None = derived from the enrolled templates
+    "wake_word_followup_seconds": 8,  # Utterances right after the wake word skip the spotter
+
+    # App launching
+    "apps_file": "astra_apps.json",  # Relative to app folder; extra aliases/commands, reloaded when changed
+    "app_match_threshold": 0.55,  # Minimum fuzzy score (0-1) for misheard app names like "crome"
+
+    # Local intent classifier (paraphrased commands skip the Gemini round-trip)
+    "intent_classifier": True,
+    "intent_classifier_threshold": 0.6,  # Minimum cosine similarity to a time/date example
+
+    # Barge-in: interrupt Astra when the user starts talking over her
+    "barge_in": True,
+    "barge_in_energy": 1500,  # RMS level (int16) that counts as user speech
+    "barge_in_coupling": 1.0,  # Initial mic level per unit of output level (speaker echo); refitted from playback
+    "barge_in_echo_margin": 1.5,  # Mic level must exceed the predicted echo by this factor
+    "barge_in_frames": 3,  # Consecutive 20 ms frames above the level before interrupting
 
     # Audio settings
     "volume": 0.8,
@@ -186,67 +361,933 @@ THEMES = {
 
 # In-memory data storage
 MEMORY = {
-    "conversation_history": [],
+    "conversation_history": [],  # Recent turns sent to Gemini: {"role", "text", "time"}
+    "conversation_summary": "",  # Rolling summary of turns that no longer fit the context budget
     "reminders": [],
-    "logs": [],
     "notes": [],
     "commands_executed": 0,
 }
 
-def ask_ai(prompt):
+SYSTEM_PROMPT = """You are Astra, a helpful and friendly AI voice assistant. 
+Keep responses concise and conversational. Be helpful and informative."""
+
+
+class ResponseCache:
+    """LRU cache of AI replies keyed by normalized prompt, with per-entry TTL and optional JSON persistence"""
+
+    # Answers that depend on the clock or on the previous turn are never cached
+    BYPASS_RE = re.compile(
+        r"\b(now|today|tonight|tomorrow|yesterday|currently|current|latest|recent|right now|"
+        r"this (?:morning|afternoon|evening|week|month|year)|time|date)\b"
+        r"|^(?:and|but|so|also|then|what about|how about|why not|tell me more|more|continue|go on|again)\b"
+        r"|\b(he|she|him|her|his|they|them|their|it|its|that|those|these)\b"  # Refers back to earlier turns
+    )
+    # Answers that go stale quickly get the short TTL
+    VOLATILE_RE = re.compile(r"\b(weather|forecast|temperature|news|headlines?|scores?|stocks?|prices?|traffic)\b")
+    CONTRACTIONS = {"what's": "what is", "who's": "who is", "where's": "where is", "how's": "how is",
+                    "it's": "it is", "that's": "that is", "what're": "what are", "i'm": "i am"}
+    FILLER = {"please", "hey", "astra", "ok", "okay", "um", "uh"}
+    # Words a fuzzy match may add or drop; any other word changes the question
+    STOP_WORDS = {"a", "an", "the", "is", "are", "do", "does", "can", "could", "would", "will", "you", "me",
+                  "tell", "just", "really", "quickly", "briefly", "so", "well"}
+    WORD_RE = re.compile(r"[a-z0-9']+")
+
+    def __init__(self, max_items: int = 256, ttl: float = 24 * 3600, volatile_ttl: float = 600,
+                 fuzzy: float = 0, path: Optional[str] = None):
+        self.max_items = max_items
+        self.ttl = ttl
+        self.volatile_ttl = volatile_ttl
+        self.fuzzy = fuzzy
+        self.path = path
+        self.entries = OrderedDict()  # normalized prompt -> {"reply", "expires", "latency"}, most recent last
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.saved_seconds = 0.0
+        self.lock = threading.Lock()
+        self._load()
+
+    @classmethod
+    def normalize(cls, prompt: str) -> str:
+        """Case, punctuation, contraction and filler-insensitive form of a prompt"""
+        text = unicodedata.normalize("NFKC", prompt).lower().replace("’", "'")
+        words = [cls.CONTRACTIONS.get(word, word) for word in cls.WORD_RE.findall(text)]
+        return " ".join(word for word in words if word not in cls.FILLER)
+
+    def cacheable(self, key: str) -> bool:
+        return bool(key) and not self.BYPASS_RE.search(key)
+
+    def get(self, prompt: str) -> Optional[str]:
+        """Cached reply for prompt, or None"""
+        key = self.normalize(prompt)
+        with self.lock:
+            if not self.cacheable(key):
+                self.bypassed += 1
+                return None
+            now = time.time()
+            entry = self.entries.get(key)
+            if entry is None and self.fuzzy > 0:
+                key, entry = self._closest(key)
+            if entry is not None and entry["expires"] <= now:
+                del self.entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            self.saved_seconds += entry["latency"]
+            print(f"Response cache hit: {key!r} (hit rate {self.hits / (self.hits + self.misses):.0%}, "
+                  f"~{entry['latency'] * 1000:.0f} ms saved, {self.saved_seconds:.1f} s total)")
+            return entry["reply"]
+
+    def _closest(self, key: str) -> Tuple[Optional[str], Optional[Dict]]:
+        """Most similar cached prompt by word-set Jaccard, if above the fuzzy threshold
+
+        Only prompts with the same content words in the same order qualify, so
+        "...in france" never matches "...in germany".
+        """
+        words = set(key.split())
+        content = [word for word in key.split() if word not in self.STOP_WORDS]
+        best_key, best_score = None, self.fuzzy
+        for other in self.entries:
+            if [word for word in other.split() if word not in self.STOP_WORDS] != content:
+                continue
+            other_words = set(other.split())
+            score = len(words & other_words) / len(words | other_words)
+            if score >= best_score:
+                best_key, best_score = other, score
+        return best_key, self.entries.get(best_key) if best_key else None
+
+    def put(self, prompt: str, reply: str, latency: float):
+        """Remember reply for prompt (ignored for time-sensitive prompts)"""
+        key = self.normalize(prompt)
+        if not self.cacheable(key):
+            return
+        ttl = self.volatile_ttl if self.VOLATILE_RE.search(key) else self.ttl
+        with self.lock:
+            self.entries[key] = {"reply": reply, "expires": time.time() + ttl, "latency": latency}
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_items:
+                self.entries.popitem(last=False)
+            self._save()
+
+    def _load(self):
+        if not self.path:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        for key, entry in saved.items():
+            if entry.get("expires", 0) > now:
+                self.entries[key] = entry
+
+    def _save(self):
+        """Write entries to disk atomically (called with the lock held)"""
+        if not self.path:
+            return
+        try:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Response cache write failed: {e}")
+
+    def clear(self):
+        """Forget every cached reply"""
+        with self.lock:
+            self.entries.clear()
+            self._save()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and time saved"""
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "hit_rate": self.hits / total if total else 0.0,
+                "saved_seconds": self.saved_seconds,
+                "items": len(self.entries),
+            }
+
+
+class CommandLog:
+    """Command history: a fixed-size ring buffer in memory, appended to a rotating JSONL file
+
+    Records are compact ({"t": unix seconds, "c": command, "r": response}) and
+    written in batches by a background thread, so memory stays constant over
+    long sessions and the history survives restarts.
     """
-    Sends user input to Gemini AI and returns the reply text.
-    Using Google Gemini API REST endpoint with key from .env file.
+
+    BATCH_LINES = 64  # Flush early once this many records are waiting
+
+    def __init__(self, path: Optional[str], max_items: int = 500, max_bytes: int = 1_000_000,
+                 max_days: float = 7, backups: int = 3, flush_seconds: float = 2.0):
+        self.path = path
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.max_age = max_days * 24 * 3600
+        self.backups = backups
+        self.flush_seconds = flush_seconds
+        self.recent = deque(maxlen=max_items)
+        self.pending = []  # Appended but not yet on disk
+        self.loaded = not path  # History from earlier sessions is read on first use, not at import
+        self.file_started = None  # Time of the first record in the current file
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.wake = threading.Event()
+        self.writer = None
+
+    def append(self, command: str, response: str):
+        """Record one handled command"""
+        record = {"t": int(time.time()), "c": command, "r": response}
+        with self.lock:
+            self.recent.append(record)
+            if not self.path:
+                return
+            self.pending.append(record)
+            if self.writer is None:
+                self.writer = threading.Thread(target=self._write_loop, name="command-log", daemon=True)
+                self.writer.start()
+            if len(self.pending) >= self.BATCH_LINES:
+                self.wake.set()
+
+    def records(self) -> List[Dict]:
+        """Most recent records, oldest first"""
+        with self.lock:
+            self._load()
+            return list(self.recent)
+
+    def _write_loop(self):
+        while True:
+            self.wake.wait(self.flush_seconds)
+            self.wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Write pending records now (also called on exit)"""
+        with self.write_lock:
+            with self.lock:
+                self._load()
+                batch, self.pending = self.pending, []
+            if not batch:
+                return
+            try:
+                if self.file_started is None:
+                    self.file_started = self._first_time(batch[0]["t"])
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write("".join(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+                                    for record in batch))
+                    size = f.tell()
+                if size >= self.max_bytes or batch[-1]["t"] - self.file_started >= self.max_age:
+                    self._rotate()
+            except OSError as e:
+                print(f"Command log write failed: {e}")
+
+    def _files(self) -> List[str]:
+        """Log files, newest first"""
+        return [self.path] + [f"{self.path}.{i}" for i in range(1, self.backups + 1)]
+
+    def _first_time(self, default: int) -> int:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.loads(f.readline())["t"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return default
+
+    def _rotate(self):
+        """path -> path.1 -> path.2 ...; the oldest backup is dropped"""
+        files = self._files()
+        if self.backups:
+            for older, newer in reversed(list(zip(files[1:], files))):
+                if os.path.exists(newer):
+                    os.replace(newer, older)
+        else:
+            os.remove(self.path)
+        self.file_started = None
+
+    def _load(self):
+        """Prepend the tail of earlier sessions to the ring buffer (called with the lock held)"""
+        if self.loaded:
+            return
+        self.loaded = True
+        history = []
+        for name in self._files():
+            need = self.max_items - len(history)
+            if need <= 0:
+                break
+            try:
+                with open(name, "r", encoding="utf-8") as f:
+                    tail = deque(f, maxlen=need)
+            except OSError:
+                continue
+            records = []
+            for line in tail:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    pass  # Partly written line from a crash
+            history = records + history
+        self.recent = deque(history + list(self.recent), maxlen=self.max_items)
+
+    def clear(self):
+        """Forget every record, on disk too"""
+        with self.write_lock, self.lock:
+            self.recent.clear()
+            self.pending.clear()
+            self.loaded = True
+            self.file_started = None
+            for name in self._files():
+                try:
+                    os.remove(name)
+                except OSError:
+                    pass
+
+    def stats(self) -> Dict:
+        """Records in memory, waiting to be written, and current file size"""
+        with self.lock:
+            size = os.path.getsize(self.path) if self.path and os.path.exists(self.path) else 0
+            return {"items": len(self.recent), "pending": len(self.pending), "file_bytes": size}
+
+
+COMMAND_LOG = CommandLog(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), CONFIG["command_log_file"])
+    if CONFIG.get("command_log_file") else None,
+    CONFIG.get("command_log_items", 500),
+    CONFIG.get("command_log_max_bytes", 1_000_000),
+    CONFIG.get("command_log_max_days", 7),
+    CONFIG.get("command_log_backups", 3),
+    CONFIG.get("command_log_flush_seconds", 2.0),
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English)"""
+    return max(1, len(text) // 4)
+
+
+class ConversationMemory:
+    """Recent turns under a token budget plus a rolling summary of everything older
+
+    Turns that fall out of the window are folded into the summary on a
+    background thread, so the prompt stays the same size however long the
+    session runs.
     """
-    api_key = CONFIG.get('gemini_api_key') or os.getenv('GEMINI_API_KEY')
-    if not api_key:
-        return "(Gemini API key not found. Add GEMINI_API_KEY to your .env file)"
 
-    # Add system context for better responses
-    system_prompt = """You are Astra, a helpful and friendly AI voice assistant. 
-    Keep responses concise and conversational. Be helpful and informative."""
-    
-    full_prompt = f"{system_prompt}\n\nUser: {prompt}\n\nAstra:"
+    SUMMARY_PROMPT = (
+        "Update the running summary of a conversation between a user and Astra, a voice assistant. "
+        "Keep names, facts, preferences, decisions and open questions; drop small talk. "
+        "Reply with the summary only, at most {words} words.\n\n"
+        "Current summary:\n{summary}\n\nNew turns:\n{turns}"
+    )
+
+    def __init__(self, config: Dict, summarize=None):
+        self.config = config
+        self.summarize = summarize  # (prompt) -> summary text or None
+        self.turns = MEMORY['conversation_history']
+        self.pending = []  # Turns evicted from the window, waiting to be summarized
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="summarizer")
+
+    def contents(self, prompt: str) -> List[Dict]:
+        """Gemini `contents` for the next request: summary, recent turns, then the new prompt"""
+        contents = []
+        with self.lock:
+            summary = MEMORY['conversation_summary']
+            if summary:
+                contents.append({"role": "user", "parts": [{"text": f"Summary of our earlier conversation: {summary}"}]})
+                contents.append({"role": "model", "parts": [{"text": "Got it."}]})
+            for turn in self.turns:
+                contents.append({"role": turn["role"], "parts": [{"text": turn["text"]}]})
+        contents.append({"role": "user", "parts": [{"text": prompt}]})
+        return contents
+
+    def add(self, prompt: str, reply: str):
+        """Record a finished exchange and evict the oldest turns beyond the token budget"""
+        now = datetime.datetime.now().isoformat()
+        budget = self.config.get('context_token_budget', 1500)
+        with self.lock:
+            self.turns.append({"role": "user", "text": prompt, "time": now})
+            self.turns.append({"role": "model", "text": reply, "time": now})
+            evicted = []
+            # Always keep the latest exchange, even if it alone is over budget
+            while len(self.turns) > 2 and sum(estimate_tokens(turn["text"]) for turn in self.turns) > budget:
+                evicted.extend(self.turns[:2])
+                del self.turns[:2]
+            if not evicted:
+                return
+            start_worker = not self.pending
+            self.pending.extend(evicted)
+        if start_worker:
+            self.executor.submit(self._fold_pending)
+
+    def tokens(self) -> int:
+        """Approximate size of what contents() sends, excluding the new prompt (at most both budgets)"""
+        return (estimate_tokens(MEMORY['conversation_summary']) if MEMORY['conversation_summary'] else 0) + \
+            sum(estimate_tokens(turn["text"]) for turn in self.turns)
+
+    def _fold_pending(self):
+        """Merge evicted turns into the rolling summary (runs on the summarizer thread)"""
+        with self.lock:
+            turns, self.pending = self.pending, []
+            summary = MEMORY['conversation_summary']
+        if not turns:
+            return
 
-    # Try using the google-generativeai library first
-    if GEMINI_AVAILABLE:
+        max_tokens = self.config.get('summary_token_budget', 300)
+        transcript = "\n".join(f"{'User' if t['role'] == 'user' else 'Astra'}: {t['text']}" for t in turns)
+        new_summary = None
+        if self.summarize:
+            try:
+                new_summary = self.summarize(self.SUMMARY_PROMPT.format(
+                    words=int(max_tokens * 0.75), summary=summary or "(none)", turns=transcript
+                ))
+            except Exception as e:
+                print(f"Conversation summary failed: {e}")
+        if not new_summary:
+            # Offline fallback: keep what the user asked, newest last
+            asked = "; ".join(t["text"] for t in turns if t["role"] == "user")
+            new_summary = f"{summary} Earlier the user asked: {asked}." if summary else f"The user asked: {asked}."
+
+        # Hard cap so a verbose summarizer can't grow the prompt; keep the most recent part
+        max_chars = max_tokens * 4
+        if len(new_summary) > max_chars:
+            new_summary = "..." + new_summary[-(max_chars - 3):]
+        with self.lock:
+            MEMORY['conversation_summary'] = new_summary.strip()
+            more = bool(self.pending)
+        if more:
+            self._fold_pending()
+
+    def clear(self):
+        """Forget the conversation"""
+        with self.lock:
+            self.turns.clear()
+            self.pending.clear()
+            MEMORY['conversation_summary'] = ""
+
+
+class CircuitBreaker:
+    """Fails fast after repeated failures; lets one trial request through after a cool-down"""
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= self.reset_seconds else "open"
+
+    def allow(self) -> bool:
+        """True if a request may be sent now"""
+        with self.lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self.trial_running:
+                self.trial_running = True
+                return True
+            return False
+
+    def retry_in(self) -> float:
+        """Seconds until a trial request will be allowed"""
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_seconds - (time.monotonic() - self.opened_at))
+
+    def release(self):
+        """An allowed request ended without a verdict (e.g. cancelled) - let the next one be the trial"""
+        with self.lock:
+            self.trial_running = False
+
+    def record(self, ok: bool):
+        """Report the outcome of an allowed request"""
+        with self.lock:
+            self.trial_running = False
+            if ok:
+                if self.opened_at is not None:
+                    print("Gemini circuit breaker closed")
+                self.failures = 0
+                self.opened_at = None
+                return
+            self.failures += 1
+            if self.failures >= self.failure_threshold or self.opened_at is not None:
+                self.opened_at = time.monotonic()
+                print(f"Gemini circuit breaker open for {self.reset_seconds:.0f} s after {self.failures} failures")
+
+
+class StreamAttempts:
+    """Retry, backoff and breaker bookkeeping for one streamed Gemini reply over REST (SSE)
+
+    Shared by the threaded (requests) and asyncio (aiohttp) streams so both
+    classify failures and retry the same way: an attempt is retried only on a
+    retryable status or connection error, and only until the first chunk has
+    been produced.
+    """
+
+    def __init__(self, client: "GeminiClient", path: str, cancel_event: Optional[threading.Event] = None,
+                 deadline: Optional[float] = None):
+        self.client = client
+        self.path = path
+        self.cancel_event = cancel_event
+        self.deadline = deadline or time.monotonic() + client.config.get('gemini_deadline', 30)
+        self.max_attempts = client.config.get('gemini_retries', 2) + 1
+        self.attempt = 0
+        self.started = None
+        self.produced = False
+        self.retry_after = None
+        self.error = "(Gemini AI Error: deadline exceeded)"
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event is not None and self.cancel_event.is_set()
+
+    def next_attempt(self) -> Optional[float]:
+        """Start the next attempt and return its timeout; None when out of attempts or time"""
+        if self.attempt >= self.max_attempts:
+            return None
+        timeout = self.client._attempt_timeout(self.deadline)
+        if timeout <= 0:
+            return None
+        self.attempt += 1
+        self.started = time.monotonic()
+        self.produced = False
+        self.retry_after = None
+        return timeout
+
+    def parse(self, line: str) -> List[str]:
+        """Reply text in one SSE line (raises ValueError on a malformed event)"""
+        line = line.strip() if line else ""
+        if not line.startswith("data:"):
+            return []
+        event = json.loads(line[5:].strip())
+        texts = [part["text"]
+                 for candidate in event.get("candidates", [])[:1]
+                 for part in candidate.get("content", {}).get("parts", []) if part.get("text")]
+        if texts:
+            self.produced = True
+        return texts
+
+    def succeeded(self):
+        self.client._record_attempt(self.path, self.attempt, self.started, 200)
+        self.client.breaker.record(True)
+
+    def failed_status(self, status: int, body: str, retry_after: Optional[str]) -> Optional[str]:
+        """Non-200 reply: the error to show if it is final, None if the attempt may be retried"""
+        self.client._record_attempt(self.path, self.attempt, self.started, status, body)
+        self.error = f"(Gemini API Error: {status} - {body[:200]})"
+        if status not in self.client.RETRYABLE_STATUS:
+            # Client errors (bad key, bad request) say nothing about Gemini's health
+            self.client.breaker.record(True)
+            return self.error
+        self.retry_after = retry_after
+        return None
+
+    def failed(self, error: Exception) -> Optional[str]:
+        """Connection error or broken stream: the error to show if it is final, None to retry"""
+        message = str(error) or type(error).__name__
+        self.client._record_attempt(self.path, self.attempt, self.started, type(error).__name__, message)
+        self.error = f"(Gemini AI Error: {message})"
+        if self.produced:
+            # Part of the reply is already on screen; a retry would repeat it
+            self.client.breaker.record(True)
+            return self.error
+        return None
+
+    def backoff_delay(self) -> Optional[float]:
+        """Seconds to wait before retrying; None if the deadline leaves no room"""
+        return self.client._backoff_delay(self.attempt - 1, self.deadline, self.retry_after)
+
+    def give_up(self) -> str:
+        """Every attempt failed: count it against Gemini and return the last error"""
+        self.client.breaker.record(False)
+        return self.error
+
+
+class GeminiClient:
+    """Long-lived Gemini client - configured once, reused for every request"""
+
+    RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+    def __init__(self, config: Dict):
+        self.config = config
+        self.api_key = None
+        self.model = None
+        self.session = None
+        self._lock = threading.Lock()
+
+        self.cache = None
+        if config.get('response_cache', True):
+            cache_file = config.get('response_cache_file')
+            self.cache = ResponseCache(
+                config.get('response_cache_items', 256),
+                config.get('response_cache_ttl', 24 * 3600),
+                config.get('response_cache_volatile_ttl', 600),
+                config.get('response_cache_fuzzy', 0),
+                os.path.join(os.path.dirname(os.path.abspath(__file__)), cache_file) if cache_file else None
+            )
+
+        self.memory = ConversationMemory(config, self._summarize) if config.get('conversation_memory', True) else None
+
+        # Resilience: every attempt is logged; the breaker short-circuits while Gemini is down
+        self.breaker = CircuitBreaker(config.get('gemini_breaker_failures', 5), config.get('gemini_breaker_reset', 30))
+        self.attempts = deque(maxlen=200)  # {"time", "path", "attempt", "status", "ms", "error"}
+        self.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="gemini")
+
+    @staticmethod
+    def _is_error(reply: str) -> bool:
+        """Error placeholders produced below are never cached"""
+        return not reply or reply.startswith(("(Gemini", "(No response", "(Invalid Gemini"))
+
+    def _ensure_ready(self, api_key: str):
+        """Configure SDK model and pooled HTTP session (only on first use or key change)"""
+        with self._lock:
+            if self.session is None:
+                # Keep-alive session so the REST path skips the TLS handshake after the first call
+                self.session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=4)
+                self.session.mount("https://", adapter)
+                self.session.headers.update({"Content-Type": "application/json"})
+
+            if api_key == self.api_key:
+                return
+
+            self.api_key = api_key
+            self.model = None
+            # Cached REST payload preamble - system instruction is built once per key
+            self.system_instruction = {"parts": [{"text": SYSTEM_PROMPT}]}
+            model_url = f"{self.config['gemini_api_base']}/models/{self.config['gemini_model']}"
+            self.rest_url = f"{model_url}:generateContent"
+            self.stream_url = f"{model_url}:streamGenerateContent"
+
+            if GEMINI_AVAILABLE and self.config.get('gemini_use_sdk', True):
+                try:
+                    genai.configure(api_key=api_key)
+                    self.model = genai.GenerativeModel(
+                        self.config['gemini_model'],
+                        system_instruction=SYSTEM_PROMPT
+                    )
+                except Exception as e:
+                    print(f"Gemini SDK setup failed, using REST only: {e}")
+                    self.model = None
+
+    def generate(self, prompt: str) -> str:
+        """Send prompt to Gemini and return the reply text (from the response cache when possible)"""
+        if self.cache is not None:
+            cached = self.cache.get(prompt)
+            if cached is not None:
+                self._remember(prompt, cached)
+                return cached
+        started = time.perf_counter()
+        reply = self._generate(self._contents(prompt))
+        if not self._is_error(reply):
+            if self.cache is not None:
+                self.cache.put(prompt, reply, time.perf_counter() - started)
+            self._remember(prompt, reply)
+        return reply
+
+    def _contents(self, prompt: str) -> List[Dict]:
+        """Structured request contents, with conversation context when memory is on"""
+        if self.memory is None:
+            return [{"role": "user", "parts": [{"text": prompt}]}]
+        contents = self.memory.contents(prompt)
+        print(f"Context: {len(contents) - 1} earlier messages, ~{self.memory.tokens()} tokens")
+        return contents
+
+    def _remember(self, prompt: str, reply: str):
+        if self.memory is not None:
+            self.memory.add(prompt, reply)
+
+    def _summarize(self, prompt: str) -> Optional[str]:
+        """One-off, context-free call used by ConversationMemory to fold old turns"""
+        reply = self._generate([{"role": "user", "parts": [{"text": prompt}]}])
+        return None if self._is_error(reply) else reply
+
+    def _generate(self, contents: List[Dict]) -> str:
+        api_key = self.config.get('gemini_api_key') or os.getenv('GEMINI_API_KEY')
+        if not api_key:
+            return "(Gemini API key not found. Add GEMINI_API_KEY to your .env file)"
+
+        self._ensure_ready(api_key)
+        if not self.breaker.allow():
+            return f"(Gemini is unavailable right now. Trying again in {self.breaker.retry_in():.0f} s)"
+
+        deadline = time.monotonic() + self.config.get('gemini_deadline', 30)
+        hedge_delay = self.config.get('gemini_hedge_delay', 2.0)
+        if self.model is None:
+            reply, ok, transient = self._call_rest(api_key, contents, deadline)
+        elif hedge_delay is None:
+            # Sequential: SDK first, REST only if it failed
+            reply, ok, transient = self._call_sdk(contents, deadline)
+            if not ok:
+                reply, ok, transient = self._call_rest(api_key, contents, deadline)
+        else:
+            reply, ok, transient = self._call_hedged(api_key, contents, deadline, hedge_delay)
+
+        # Client errors (bad key, bad request) say nothing about Gemini's health
+        self.breaker.record(ok or not transient)
+        return reply
+
+    def _call_hedged(self, api_key: str, contents: List[Dict], deadline: float,
+                     hedge_delay: float) -> Tuple[str, bool, bool]:
+        """SDK first; REST joins if the SDK fails or hasn't answered within hedge_delay - first success wins"""
+        futures = {self.executor.submit(self._call_sdk, contents, deadline): "sdk"}
+        result = None
+        hedged = False
+        while futures:
+            done, _ = wait(list(futures), timeout=None if hedged else hedge_delay, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = futures.pop(future)
+                result = future.result()
+                if result[1]:
+                    if hedged:
+                        print(f"Gemini hedge: {path} answered first")
+                    return result
+            if not hedged:
+                # SDK is slow or failed - start REST (immediately on failure)
+                hedged = True
+                futures[self.executor.submit(self._call_rest, api_key, contents, deadline)] = "rest"
+        return result
+
+    def _record_attempt(self, path: str, attempt: int, started: float, status, error: str = ""):
+        """Log one attempt (kept in self.attempts for inspection)"""
+        entry = {
+            "time": datetime.datetime.now().isoformat(),
+            "path": path,
+            "attempt": attempt,
+            "status": status,
+            "ms": round((time.monotonic() - started) * 1000),
+            "error": error[:200],
+        }
+        self.attempts.append(entry)
+        print(f"Gemini {path} attempt {attempt}: {status} in {entry['ms']} ms" + (f" - {entry['error']}" if error else ""))
+
+    def _backoff_delay(self, attempt: int, deadline: float, retry_after: Optional[str] = None) -> Optional[float]:
+        """Seconds to wait before the next attempt; None if the deadline leaves no room for one"""
         try:
-            genai.configure(api_key=api_key)
-            # Use gemini-2.5-flash model
-            model = genai.GenerativeModel('gemini-2.5-flash')
-            response = model.generate_content(full_prompt)
-            return response.text.strip()
-        except Exception:
-            pass  # Fall through to REST API
+            delay = float(retry_after) if retry_after else None
+        except ValueError:
+            delay = None
+        if delay is None:
+            # Full jitter: uniform in [0, base * 2^attempt]
+            delay = random.uniform(0, self.config.get('gemini_backoff', 0.5) * (2 ** attempt))
+        if time.monotonic() + delay + 1.0 >= deadline:
+            return None
+        return delay
 
-    # Fallback to direct REST API call
-    try:
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent?key={api_key}"
-        
-        headers = {"Content-Type": "application/json"}
-        data = {
-            "contents": [{
-                "parts": [{"text": full_prompt}]
-            }]
+    def _backoff(self, attempt: int, deadline: float, retry_after: Optional[str] = None) -> bool:
+        """Sleep before the next attempt; False if the deadline leaves no room for one"""
+        delay = self._backoff_delay(attempt, deadline, retry_after)
+        if delay is None:
+            return False
+        time.sleep(delay)
+        return True
+
+    def _attempt_timeout(self, deadline: float) -> float:
+        return min(self.config.get('gemini_attempt_timeout', 12), deadline - time.monotonic())
+
+    def _call_sdk(self, contents: List[Dict], deadline: float) -> Tuple[str, bool, bool]:
+        """One SDK attempt -> (reply or error text, ok, transient failure)"""
+        started = time.monotonic()
+        try:
+            response = self.model.generate_content(
+                contents, request_options={"timeout": max(1.0, self._attempt_timeout(deadline))}
+            )
+            reply = response.text.strip()
+            self._record_attempt("sdk", 1, started, 200)
+            return reply, True, False
+        except Exception as e:
+            status = getattr(e, "code", None)
+            status = status if isinstance(status, int) else type(e).__name__
+            self._record_attempt("sdk", 1, started, status, str(e))
+            transient = not isinstance(status, int) or status in self.RETRYABLE_STATUS
+            return f"(Gemini AI Error: {e})", False, transient
+
+    def request_body(self, contents: List[Dict]) -> Dict:
+        """REST payload for generateContent/streamGenerateContent"""
+        return {
+            "systemInstruction": self.system_instruction,
+            "contents": contents
         }
-        
-        response = requests.post(url, headers=headers, json=data, timeout=30)
-        
-        if response.status_code == 200:
-            result = response.json()
-            if "candidates" in result and len(result["candidates"]) > 0:
-                return result["candidates"][0]["content"]["parts"][0]["text"].strip()
-            return "(No response from Gemini)"
-        
-        return f"(Gemini API Error: {response.status_code} - {response.text[:200]})"
-        
-    except Exception as e:
-        error_msg = str(e)
-        if "API_KEY_INVALID" in error_msg:
-            return "(Invalid Gemini API key. Please check your .env file)"
-        elif "QUOTA" in error_msg.upper():
-            return "(Gemini API quota exceeded. Please try again later)"
-        return f"(Gemini AI Error: {error_msg})"
+
+    def _call_rest(self, api_key: str, contents: List[Dict], deadline: float) -> Tuple[str, bool, bool]:
+        """REST with per-attempt timeouts and jittered backoff on retryable failures"""
+        data = self.request_body(contents)
+        reply = "(Gemini AI Error: deadline exceeded)"
+        for attempt in range(1, self.config.get('gemini_retries', 2) + 2):
+            timeout = self._attempt_timeout(deadline)
+            if timeout <= 0:
+                break
+            started = time.monotonic()
+            retry_after = None
+            try:
+                response = self.session.post(
+                    self.rest_url, params={"key": api_key}, json=data, timeout=timeout
+                )
+                self._record_attempt("rest", attempt, started, response.status_code,
+                                     "" if response.status_code == 200 else response.text)
+
+                if response.status_code == 200:
+                    result = response.json()
+                    if "candidates" in result and len(result["candidates"]) > 0:
+                        return result["candidates"][0]["content"]["parts"][0]["text"].strip(), True, False
+                    return "(No response from Gemini)", True, False
+
+                reply = f"(Gemini API Error: {response.status_code} - {response.text[:200]})"
+                if "API_KEY_INVALID" in response.text:
+                    return "(Invalid Gemini API key. Please check your .env file)", False, False
+                if response.status_code not in self.RETRYABLE_STATUS:
+                    return reply, False, False
+                if response.status_code == 429:
+                    reply = "(Gemini API quota exceeded. Please try again later)"
+                retry_after = response.headers.get("Retry-After")
+
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                self._record_attempt("rest", attempt, started, type(e).__name__, str(e))
+                reply = f"(Gemini AI Error: {e})"
+            except Exception as e:
+                self._record_attempt("rest", attempt, started, type(e).__name__, str(e))
+                return f"(Gemini AI Error: {e})", False, False
+
+            if not self._backoff(attempt - 1, deadline, retry_after):
+                break
+        return reply, False, True
+
+    def stream(self, prompt: str, cancel_event: Optional[threading.Event] = None) -> Iterator[str]:
+        """Stream reply text chunks from Gemini as they are generated (a cached reply arrives as one chunk)"""
+        if self.cache is not None:
+            cached = self.cache.get(prompt)
+            if cached is not None:
+                self._remember(prompt, cached)
+                yield cached
+                return
+        started = time.perf_counter()
+        parts = []
+        for chunk in self._stream(self._contents(prompt), cancel_event):
+            parts.append(chunk)
+            yield chunk
+        self._finish_stream(prompt, parts, started, cancel_event is not None and cancel_event.is_set())
+
+    def _finish_stream(self, prompt: str, parts: List[str], started: float, cancelled: bool):
+        """Cache and remember a streamed reply once it has ended"""
+        reply = "".join(parts).strip()
+        if not reply or any(self._is_error(chunk) for chunk in parts):
+            return
+        if self.cache is not None and not cancelled:
+            self.cache.put(prompt, reply, time.perf_counter() - started)
+        # An interrupted reply is remembered as far as the user heard it
+        self._remember(prompt, reply + (" [interrupted]" if cancelled else ""))
+
+    def _stream(self, contents: List[Dict], cancel_event: Optional[threading.Event]) -> Iterator[str]:
+        api_key = self.config.get('gemini_api_key') or os.getenv('GEMINI_API_KEY')
+        if not api_key:
+            yield "(Gemini API key not found. Add GEMINI_API_KEY to your .env file)"
+            return
+
+        self._ensure_ready(api_key)
+        if not self.breaker.allow():
+            yield f"(Gemini is unavailable right now. Trying again in {self.breaker.retry_in():.0f} s)"
+            return
+        try:
+            yield from self._stream_attempts(api_key, contents, cancel_event)
+        finally:
+            self.breaker.release()
+
+    def _stream_attempts(self, api_key: str, contents: List[Dict],
+                         cancel_event: Optional[threading.Event]) -> Iterator[str]:
+        deadline = time.monotonic() + self.config.get('gemini_deadline', 30)
+
+        # SDK streaming first; only fall back to REST if nothing was produced yet
+        if self.model is not None:
+            produced = False
+            started = time.monotonic()
+            try:
+                for chunk in self.model.generate_content(
+                    contents, stream=True, request_options={"timeout": max(1.0, self._attempt_timeout(deadline))}
+                ):
+                    if cancel_event is not None and cancel_event.is_set():
+                        return
+                    if chunk.text:
+                        produced = True
+                        yield chunk.text
+                self._record_attempt("sdk-stream", 1, started, 200)
+                self.breaker.record(True)
+                return
+            except Exception as e:
+                self._record_attempt("sdk-stream", 1, started, type(e).__name__, str(e))
+                if produced:
+                    self.breaker.record(True)
+                    return
+
+        # REST streaming via server-sent events; retried only until the first chunk arrives
+        attempts = StreamAttempts(self, "rest-stream", cancel_event, deadline)
+        while (timeout := attempts.next_attempt()) is not None:
+            try:
+                with self.session.post(
+                    self.stream_url, params={"key": api_key, "alt": "sse"},
+                    json=self.request_body(contents), timeout=timeout, stream=True
+                ) as response:
+                    if response.status_code != 200:
+                        final = attempts.failed_status(response.status_code, response.text,
+                                                       response.headers.get("Retry-After"))
+                        if final:
+                            yield final
+                            return
+                    else:
+                        for line in response.iter_lines(decode_unicode=True):
+                            if attempts.cancelled:
+                                return
+                            yield from attempts.parse(line)
+                        attempts.succeeded()
+                        return
+            except Exception as e:
+                final = attempts.failed(e)
+                if final:
+                    yield final
+                    return
+
+            if attempts.cancelled:
+                return
+            delay = attempts.backoff_delay()
+            if delay is None:
+                break
+            time.sleep(delay)
+
+        yield attempts.give_up()
+
+
+_gemini_client: Optional[GeminiClient] = None
+_gemini_client_lock = threading.Lock()
+
+
+def get_gemini_client() -> GeminiClient:
+    """Return the shared Gemini client, creating it lazily on first use"""
+    global _gemini_client
+    if _gemini_client is None:
+        with _gemini_client_lock:
+            if _gemini_client is None:
+                _gemini_client = GeminiClient(CONFIG)
+    return _gemini_client
+
+
+def ask_ai(prompt):
+    """
+    Sends user input to Gemini AI and returns the reply text.
+    Uses the shared GeminiClient (SDK first, pooled REST session as fallback).
+    """
+    return get_gemini_client().generate(prompt)
 
 # ============================================================================
 # SIGNAL MANAGER (Thread-safe communication)
@@ -262,149 +1303,1014 @@ class SignalManager(QObject):
     error_occurred = pyqtSignal(str)
     reminder_alert = pyqtSignal(str)
     typing_complete = pyqtSignal()
-    ai_response_ready = pyqtSignal(str)  # AI response text for thread-safe UI update
+    ai_response_ready = pyqtSignal(int, str)  # turn generation, AI response text for thread-safe UI update
+    ai_stream_chunk = pyqtSignal(int, str)  # turn generation, partial AI response text while streaming
+    ai_stream_finished = pyqtSignal(int, str)  # turn generation, full AI response text once streaming ends
+    barge_in = pyqtSignal()  # User started speaking while Astra was talking
+    interim_transcript = pyqtSignal(str)  # Partial transcript while the user is still speaking
+    engine_status = pyqtSignal(str, str)  # engine name, "loading" | "ready" | "unavailable"
+    app_launch_result = pyqtSignal(str, bool, str)  # app, launched, message
 
 
 # ============================================================================
 # AUDIO & TTS ENGINE
 # ============================================================================
 
+class TTSCache:
+    """Two-tier (memory + disk) LRU cache of synthesized audio, keyed by content"""
+
+    def __init__(self, cache_dir: str, memory_items: int = 64, disk_max_bytes: int = 50 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.memory_items = memory_items
+        self.disk_max_bytes = disk_max_bytes
+        self.memory = OrderedDict()  # key -> audio bytes, most recently used last
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+        except OSError as e:
+            print(f"TTS cache: disk tier disabled ({e})")
+            self.cache_dir = None
+
+    @staticmethod
+    def make_key(voice_id: str, text: str, audio_format: str, sample_rate: int) -> str:
+        """Content address for a synthesis request"""
+        normalized = " ".join(unicodedata.normalize("NFKC", text).split())
+        raw = json.dumps([voice_id, normalized, audio_format.upper(), int(sample_rate)])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.audio")
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return cached audio bytes or None"""
+        with self.lock:
+            data = self.memory.get(key)
+            if data is not None:
+                self.memory.move_to_end(key)
+                self.hits += 1
+                return data
+
+            if self.cache_dir:
+                path = self._path(key)
+                try:
+                    with open(path, "rb") as f:
+                        data = f.read()
+                    os.utime(path)  # mtime doubles as the disk LRU clock
+                except OSError:
+                    data = None
+                if data is not None:
+                    self._remember(key, data)
+                    self.hits += 1
+                    return data
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, data: bytes):
+        """Store audio bytes in both tiers"""
+        with self.lock:
+            self._remember(key, data)
+            if not self.cache_dir:
+                return
+            try:
+                tmp_path = self._path(key) + ".tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, self._path(key))
+                self._evict_disk()
+            except OSError as e:
+                print(f"TTS cache write failed: {e}")
+
+    def _remember(self, key: str, data: bytes):
+        self.memory[key] = data
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_items:
+            self.memory.popitem(last=False)
+
+    def _evict_disk(self):
+        """Delete least recently used files until the directory fits the size cap"""
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".audio"):
+                continue
+            stat = os.stat(os.path.join(self.cache_dir, name))
+            entries.append((stat.st_mtime, stat.st_size, name))
+            total += stat.st_size
+        entries.sort()
+        while total > self.disk_max_bytes and entries:
+            _, size, name = entries.pop(0)
+            os.remove(os.path.join(self.cache_dir, name))
+            total -= size
+
+    def clear(self):
+        """Remove every cached clip from memory and disk"""
+        with self.lock:
+            self.memory.clear()
+            if self.cache_dir:
+                for name in os.listdir(self.cache_dir):
+                    if name.endswith(".audio"):
+                        os.remove(os.path.join(self.cache_dir, name))
+
+    def stats(self) -> Dict:
+        """Hit/miss counters"""
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "memory_items": len(self.memory),
+            }
+
+
 class AudioEngine:
     """Handles all audio playback and TTS operations"""
 
     def __init__(self, config: Dict):
         self.config = config
-        self.is_speaking = False
-        self.audio_queue = queue.Queue()
+        self.audio_queue = queue.Queue()  # (generation, AudioSegment) consumed by the playback worker
+        self.playback_generation = 0  # Bumped by stop_speaking() to drop queued/playing clips
+        self.output_level = 0.0  # RMS of the 20 ms block being played (16-bit clips), for barge-in echo gating
+        self.is_playing = False
+        self.fallback_speaking = False
+        self.output_stream = None
+        self.output_format = None
+        self.pyaudio_instance = None
         self.tts_engine = None
+        self.last_synthesis = None  # {"path": "inline" | "download", "ms": float}
+        self.session = requests.Session()  # Keep-alive connection to Murf
+        self.async_engine = None  # Set by the window; synthesis then runs on the asyncio engine
+        self.pipeline = SpeechPipeline(self, config.get('tts_workers', 3))
+        self.cache = TTSCache(
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), config.get('tts_cache_dir', 'astra_tts_cache')),
+            memory_items=config.get('tts_cache_memory_items', 64),
+            disk_max_bytes=config.get('tts_cache_disk_mb', 50) * 1024 * 1024
+        )
+
+        # One long-lived playback worker keeps clips in order and never overlaps them
+        threading.Thread(target=self._playback_loop, daemon=True).start()
+
+    @property
+    def is_speaking(self) -> bool:
+        """True while a clip is playing, queued for playback or still being synthesized"""
+        return self.is_playing or self.fallback_speaking or not self.audio_queue.empty() or self.pipeline.busy
+
+    def synthesize_murf(self, text: str):
+        """Generate speech for text with Murf AI and return the decoded AudioSegment"""
+        if not PYDUB_AVAILABLE:
+            print("ERROR: pydub not available to decode Murf audio")
+            return None
 
-        # Initialize pyttsx3 as fallback TTS
-        if TTS_AVAILABLE:
-            try:
-                self.tts_engine = pyttsx3.init()
-                self.tts_engine.setProperty('rate', config.get('speech_rate', 150))
-                self.tts_engine.setProperty('volume', config.get('volume', 0.8))
-                print("TTS Engine (pyttsx3) initialized successfully")
-            except Exception as e:
-                print(f"TTS engine initialization failed: {e}")
-        else:
-            print("Warning: pyttsx3 not available. Install with: pip install pyttsx3")
+        payload, key = self.murf_payload(text)
 
-    def speak_murf(self, text: str) -> bool:
-        """Use Murf AI for TTS (premium voice) - REQUIRED"""
-        if not REQUESTS_AVAILABLE:
-            print("ERROR: Requests library not available for Murf TTS")
-            return False
+        # Templated replies are served from the cache with zero network round-trips
+        audio_bytes = self.cache.get(key)
+        if audio_bytes is not None:
+            print("Murf TTS: Cache hit")
+        else:
+            audio_bytes = self._fetch_murf_audio(payload)
+            if audio_bytes is None:
+                return None
+            self.cache.put(key, audio_bytes)
+
+        return self.decode_audio(audio_bytes)
+
+    def murf_payload(self, text: str) -> Tuple[Dict, str]:
+        """Murf request body for text and its TTS cache key"""
+        # Payload - request WAV format in payload, not header
+        payload = {
+            "voiceId": "en-US-natalie",
+            "text": text,
+            "format": "WAV",
+            "sampleRate": 24000,
+            "channelType": "MONO"
+        }
+        key = TTSCache.make_key(payload["voiceId"], text, payload["format"], payload["sampleRate"])
+        return payload, key
 
+    def murf_request(self, payload: Dict) -> Optional[Tuple[str, Dict, Dict]]:
+        """(url, headers, body) for a Murf call, or None if no API key is configured"""
         # Get API key from config (loaded from .env)
         api_key = self.config.get('murf_api_key') or os.getenv('MURF_API_KEY')
         if not api_key:
             print("ERROR: Murf API key not found in .env file")
-            return False
+            return None
 
-        try:
-            # Murf API endpoint for text-to-speech
-            url = "https://api.murf.ai/v1/speech/generate"
-            
-            headers = {
-                "api-key": api_key,
-                "Content-Type": "application/json",
-                "Accept": "application/json"
-            }
+        # Murf API endpoint for text-to-speech
+        url = self.config.get('murf_api_url', "https://api.murf.ai/v1/speech/generate")
+        headers = {
+            "api-key": api_key,
+            "Content-Type": "application/json",
+            "Accept": "application/json"
+        }
 
-            # Payload - request WAV format in payload, not header
-            payload = {
-                "voiceId": "en-US-natalie",
-                "text": text,
-                "format": "WAV",
-                "sampleRate": 24000,
-                "channelType": "MONO"
-            }
+        # Inline mode: audio comes back base64-encoded in the same response
+        if self.config.get('murf_inline_audio', True):
+            payload = dict(payload, encodeAsBase64=True)
+        return url, headers, payload
+
+    def _fetch_murf_audio(self, payload: Dict) -> Optional[bytes]:
+        """Request speech from Murf AI and return the raw audio bytes"""
+        if not REQUESTS_AVAILABLE:
+            print("ERROR: Requests library not available for Murf TTS")
+            return None
+
+        request = self.murf_request(payload)
+        if request is None:
+            return None
+        url, headers, payload = request
 
+        try:
             print(f"Murf TTS: Generating speech...")
+            started = time.perf_counter()
             
-            response = requests.post(url, headers=headers, json=payload, timeout=60)
+            response = self.session.post(url, headers=headers, json=payload, timeout=60)
             print(f"Murf API status: {response.status_code}")
 
             if response.status_code == 200:
                 result = response.json()
+
+                # Inline audio - decode straight from the response buffer
+                encoded_audio = result.get('encodedAudio')
+                if encoded_audio:
+                    audio_bytes = base64.b64decode(encoded_audio)
+                    self.record_synthesis("inline", started)
+                    return audio_bytes
                 
-                # Get audio URL from response
+                # Otherwise download from the returned audio URL (second round-trip)
                 audio_url = result.get('audioFile')
                 
                 if audio_url:
                     print(f"Murf TTS: Downloading audio...")
-                    audio_response = requests.get(audio_url, timeout=30)
+                    audio_response = self.session.get(audio_url, timeout=30)
                     
-                    if audio_response.status_code == 200 and PYDUB_AVAILABLE:
-                        # Try WAV first, then MP3
-                        try:
-                            audio_segment = AudioSegment.from_wav(io.BytesIO(audio_response.content))
-                        except Exception:
-                            audio_segment = AudioSegment.from_mp3(io.BytesIO(audio_response.content))
-                        print("Murf TTS: Playing...")
-                        play(audio_segment)
-                        return True
-                
-                # Try encoded audio
-                encoded_audio = result.get('encodedAudio')
-                if encoded_audio and PYDUB_AVAILABLE:
-                    audio_bytes = base64.b64decode(encoded_audio)
-                    try:
-                        audio_segment = AudioSegment.from_wav(io.BytesIO(audio_bytes))
-                    except Exception:
-                        audio_segment = AudioSegment.from_mp3(io.BytesIO(audio_bytes))
-                    play(audio_segment)
-                    return True
+                    if audio_response.status_code == 200:
+                        self.record_synthesis("download", started)
+                        return audio_response.content
             
             # Handle errors
             print(f"Murf API error {response.status_code}: {response.text[:500]}")
-            return False
+            return None
 
         except Exception as e:
             print(f"Murf TTS error: {e}")
+            return None
+
+    def record_synthesis(self, path: str, started: float):
+        """Remember which Murf path served the last clip and how long it took"""
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.last_synthesis = {"path": path, "ms": elapsed_ms}
+        print(f"Murf TTS: {path} audio in {elapsed_ms:.0f} ms")
+
+    def decode_audio(self, audio_bytes: bytes):
+        """Decode Murf audio bytes - try WAV first, then MP3"""
+        try:
+            return pydub.AudioSegment.from_wav(io.BytesIO(audio_bytes))
+        except Exception:
+            return pydub.AudioSegment.from_mp3(io.BytesIO(audio_bytes))
+
+    def play_segment(self, audio_segment):
+        """Queue a decoded audio clip for the playback worker"""
+        self.audio_queue.put((self.playback_generation, audio_segment))
+
+    def stop_speaking(self):
+        """Cancel the playing clip, flush queued clips and pending synthesis"""
+        # Cancel the pipeline first: it may be handing a clip over with the current generation
+        self.pipeline.cancel()
+        self.playback_generation += 1
+        while True:
+            try:
+                self.audio_queue.get_nowait()
+            except queue.Empty:
+                break
+
+    def _playback_loop(self):
+        """Play queued clips in order on a persistent output stream"""
+        while True:
+            generation, audio_segment = self.audio_queue.get()
+            if generation != self.playback_generation:
+                continue  # Flushed by stop_speaking()
+
+            self.is_playing = True
+            try:
+                print("Murf TTS: Playing...")
+                if AUDIO_AVAILABLE:
+                    self._write_to_stream(audio_segment, generation)
+                else:
+                    pydub_playback.play(audio_segment)
+            except Exception as e:
+                print(f"Playback error: {e}")
+                self._close_stream()
+            finally:
+                self.is_playing = False
+                self.output_level = 0.0
+
+    def _write_to_stream(self, audio_segment, generation: int):
+        """Write PCM to the shared output stream in small blocks so playback can be cancelled"""
+        audio_format = (audio_segment.sample_width, audio_segment.channels, audio_segment.frame_rate)
+        if self.output_stream is None or audio_format != self.output_format:
+            # Reopen only when the clip format changes
+            self._close_stream()
+            if self.pyaudio_instance is None:
+                self.pyaudio_instance = pyaudio.PyAudio()
+            self.output_stream = self.pyaudio_instance.open(
+                format=self.pyaudio_instance.get_format_from_width(audio_segment.sample_width),
+                channels=audio_segment.channels,
+                rate=audio_segment.frame_rate,
+                output=True
+            )
+            self.output_format = audio_format
+
+        data = audio_segment.raw_data
+        block = audio_segment.frame_width * (audio_segment.frame_rate // 50)  # 20 ms
+        for offset in range(0, len(data), block):
+            if generation != self.playback_generation:
+                return
+            chunk = data[offset:offset + block]
+            if audio_segment.sample_width == 2:
+                self.output_level = pcm_rms(chunk)
+            self.output_stream.write(chunk)
+
+    def _close_stream(self):
+        """Close the output stream (reopened lazily on the next clip)"""
+        if self.output_stream is not None:
+            try:
+                self.output_stream.stop_stream()
+                self.output_stream.close()
+            except Exception:
+                pass
+        self.output_stream = None
+        self.output_format = None
+
+    def speak_murf(self, text: str) -> bool:
+        """Use Murf AI for TTS (premium voice) - REQUIRED"""
+        audio_segment = self.synthesize_murf(text)
+        if audio_segment is None:
             return False
+        self.play_segment(audio_segment)
+        return True
+
+    def _get_tts_engine(self):
+        """Initialize pyttsx3 fallback TTS on first use (the Murf path never needs it)"""
+        if self.tts_engine is None and TTS_AVAILABLE:
+            try:
+                self.tts_engine = pyttsx3.init()
+                self.tts_engine.setProperty('rate', self.config.get('speech_rate', 150))
+                self.tts_engine.setProperty('volume', self.config.get('volume', 0.8))
+                print("TTS Engine (pyttsx3) initialized successfully")
+            except Exception as e:
+                print(f"TTS engine initialization failed: {e}")
+        elif not TTS_AVAILABLE:
+            print("Warning: pyttsx3 not available. Install with: pip install pyttsx3")
+        return self.tts_engine
 
     def speak_fallback(self, text: str):
         """Fallback TTS using pyttsx3"""
-        if self.tts_engine:
+        if self._get_tts_engine():
             try:
-                self.is_speaking = True
+                self.fallback_speaking = True
                 self.tts_engine.say(text)
                 self.tts_engine.runAndWait()
-                self.is_speaking = False
+                self.fallback_speaking = False
                 return True
             except Exception as e:
                 print(f"Fallback TTS error: {e}")
-                self.is_speaking = False
+                self.fallback_speaking = False
         return False
 
-    def speak(self, text: str):
-        """Main speak method - Uses Murf TTS only"""
-        if not text or not text.strip():
-            return
-            
-        # Clean text for TTS
-        clean_text = text.strip()
-        
-        def _speak_thread():
-            print(f"TTS: Speaking '{clean_text[:50]}...'")
-            
-            # Use Murf TTS only
-            success = self.speak_murf(clean_text)
-            if success:
-                print("TTS: Murf succeeded")
-            else:
-                print("TTS: Murf failed - check API key and connection")
+    def speak(self, text: str):
+        """Main speak method - Uses Murf TTS only (sentence-pipelined)"""
+        if not text or not text.strip():
+            return
+            
+        # Clean text for TTS
+        clean_text = text.strip()
+        print(f"TTS: Speaking '{clean_text[:50]}...'")
+
+        # Pipeline synthesizes sentences in parallel and plays them in order
+        self.pipeline.feed(clean_text)
+        self.pipeline.finish()
+
+
+class SpeechPipeline:
+    """Splits (streamed) text at sentence boundaries, synthesizes sentences
+    concurrently with Murf and plays the clips strictly in order"""
+
+    SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n+")
+
+    def __init__(self, audio_engine: AudioEngine, max_workers: int = 3, min_chars: int = 20):
+        self.audio = audio_engine
+        self.min_chars = min_chars
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="murf")
+        self.pending = queue.Queue()  # (generation, future) in speaking order; None ends an utterance
+        self.outstanding = 0  # Sentences submitted but not yet handed to playback (or dropped)
+        self.generation = 0  # Bumped by cancel() so in-flight sentences are dropped
+        self.buffer = ""
+        self.utterance_start = None
+        self.first_audio_logged = False
+        self.lock = threading.Lock()
+
+        threading.Thread(target=self._play_loop, daemon=True).start()
+
+    def feed(self, text: str):
+        """Add reply text; every complete sentence is sent to Murf right away"""
+        with self.lock:
+            if self.utterance_start is None:
+                self.utterance_start = time.perf_counter()
+                self.first_audio_logged = False
+            self.buffer += text
+
+            # Keep the last (possibly incomplete) piece in the buffer
+            pieces = self.SENTENCE_BOUNDARY.split(self.buffer)
+            self.buffer = pieces.pop()
+            sentence = ""
+            for piece in pieces:
+                sentence = f"{sentence} {piece}".strip()
+                # Merge very short fragments so clips don't sound choppy
+                if len(sentence) >= self.min_chars:
+                    self._submit(sentence)
+                    sentence = ""
+            if sentence:
+                self.buffer = f"{sentence} {self.buffer}"
+
+    def finish(self):
+        """Flush the remaining text and mark the end of the utterance"""
+        with self.lock:
+            if self.buffer.strip():
+                self._submit(self.buffer.strip())
+            self.buffer = ""
+            self.pending.put(None)
+
+    def cancel(self):
+        """Drop buffered text and every sentence not yet played"""
+        with self.lock:
+            self.generation += 1
+            self.buffer = ""
+            while True:
+                try:
+                    item = self.pending.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not None:
+                    item[1].cancel()
+            self.outstanding = 0  # Includes the sentence _play_loop may be waiting on
+            self.utterance_start = None
+
+    @property
+    def busy(self) -> bool:
+        """True while a sentence is being synthesized or waiting for its turn to play"""
+        return self.outstanding > 0
+
+    def _submit(self, sentence: str):
+        """Queue Murf synthesis for one sentence (asyncio engine if running, else the bounded worker pool)"""
+        engine = self.audio.async_engine
+        if engine is not None:
+            future = engine.submit(engine.synthesize(sentence))
+        else:
+            future = self.executor.submit(self.audio.synthesize_murf, sentence)
+        self.outstanding += 1
+        self.pending.put((self.generation, future))
+
+    def _play_loop(self):
+        """Hand synthesized clips to the playback worker in enqueue order"""
+        while True:
+            item = self.pending.get()
+            if item is None:
+                with self.lock:
+                    self.utterance_start = None
+                continue
+
+            generation, future = item
+            try:
+                audio_segment = future.result()
+            except concurrent.futures.CancelledError:
+                audio_segment = None
+            except Exception as e:
+                print(f"TTS pipeline error: {e}")
+                audio_segment = None
+            else:
+                if audio_segment is None:
+                    print("TTS: Murf failed - check API key and connection")
+
+            with self.lock:
+                if generation != self.generation:
+                    continue  # Cancelled while synthesizing (cancel() already settled the count)
+                self.outstanding -= 1
+                if audio_segment is None:
+                    continue
+                if self.utterance_start is not None and not self.first_audio_logged:
+                    self.first_audio_logged = True
+                    elapsed = (time.perf_counter() - self.utterance_start) * 1000
+                    print(f"TTS pipeline: time-to-first-audio {elapsed:.0f} ms")
+                self.audio.play_segment(audio_segment)
+
+
+# ============================================================================
+# SPEECH RECOGNITION ENGINE
+# ============================================================================
+
+def pcm_rms(frame: bytes) -> float:
+    """RMS level of a 16-bit PCM frame"""
+    samples = array.array('h', frame)
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(x * x for x in samples) / len(samples))
+
+
+class VoiceActivityDetector:
+    """Vectorized (NumPy) frame-level voice activity detector with hangover"""
+
+    def __init__(self, config: Dict, rate: int = 16000, frame_samples: int = 320):
+        self.config = config
+        self.rate = rate
+        self.frame_samples = frame_samples
+        self.noise_floor = float(config.get('vad_min_energy', 300)) / 2
+
+    @property
+    def frame_ms(self) -> float:
+        return 1000.0 * self.frame_samples / self.rate
+
+    @property
+    def hangover_frames(self) -> int:
+        return max(1, int(self.config.get('vad_hangover_ms', 200) / self.frame_ms))
+
+    def _frames(self, pcm: bytes):
+        """View 16-bit PCM as a (frames, samples) float matrix"""
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        count = len(samples) // self.frame_samples
+        return samples[:count * self.frame_samples].reshape(count, self.frame_samples).astype(np.float32)
+
+    def raw_mask(self, pcm: bytes):
+        """Per-frame speech decision (no hangover); adapts the noise floor from non-speech frames"""
+        frames = self._frames(pcm)
+        if not len(frames):
+            return np.zeros(0, dtype=bool)
+
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        # Zero-crossing rate rejects broadband hiss that is loud but not voiced; unvoiced
+        # consonants fail it too, but they sit next to vowels and are kept by hangover/padding
+        zcr = np.mean(np.abs(np.diff(np.signbit(frames), axis=1)), axis=1)
+        threshold = max(float(self.config.get('vad_min_energy', 300)),
+                        self.noise_floor * float(self.config.get('vad_energy_ratio', 3.0)))
+        mask = (rms > threshold) & (zcr < float(self.config.get('vad_max_zcr', 0.3)))
+
+        quiet = rms[~mask]
+        if len(quiet):
+            self.noise_floor = 0.95 * self.noise_floor + 0.05 * float(np.mean(quiet))
+        return mask
+
+    def speech_mask(self, pcm: bytes):
+        """Per-frame speech decision with hangover applied"""
+        mask = self.raw_mask(pcm)
+        if not len(mask):
+            return mask
+        window = np.ones(self.hangover_frames + 1)
+        return np.convolve(mask.astype(np.float32), window)[:len(mask)] > 0
+
+    def has_speech(self, pcm: bytes) -> bool:
+        """True if the clip holds enough voiced audio to be worth recognizing"""
+        voiced_ms = int(np.count_nonzero(self.raw_mask(pcm))) * self.frame_ms
+        return voiced_ms >= self.config.get('vad_min_speech_ms', 120)
+
+    def trim(self, pcm: bytes, pad_ms: int = 100) -> bytes:
+        """Cut leading/trailing silence, keeping a little padding around the speech"""
+        voiced = np.flatnonzero(self.raw_mask(pcm))
+        if not len(voiced):
+            return b""
+        pad = int(pad_ms / self.frame_ms)
+        frame_bytes = self.frame_samples * 2
+        start = max(0, voiced[0] - pad) * frame_bytes
+        end = min(len(pcm) // frame_bytes, voiced[-1] + 1 + pad) * frame_bytes
+        return pcm[start:end]
+
+
+class WakeWordSpotter:
+    """Offline keyword spotter - MFCC features matched against enrolled templates with DTW"""
+
+    N_FFT = 512
+    N_MELS = 26
+    N_CEPS = 13
+    DEFAULT_THRESHOLD = 6.0  # Used until at least two templates are enrolled
+
+    def __init__(self, config: Dict, rate: int = 16000):
+        self.config = config
+        self.rate = rate
+        self.win = int(0.025 * rate)
+        self.hop = int(0.010 * rate)
+        self.window = np.hamming(self.win).astype(np.float32)
+        self.mel_fb = self._mel_filterbank()
+        # DCT-II basis, dropping c0 (overall loudness)
+        n = np.arange(self.N_MELS)
+        k = np.arange(1, self.N_CEPS)[:, None]
+        self.dct = (np.cos(np.pi * k * (2 * n + 1) / (2 * self.N_MELS)) * np.sqrt(2.0 / self.N_MELS)).astype(np.float32)
+
+        self.templates = []
+        self.threshold = None
+        self.path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                 config.get('wake_word_templates', 'astra_wakeword.npz'))
+        self.load()
+
+    @property
+    def ready(self) -> bool:
+        return bool(self.templates)
+
+    def _mel_filterbank(self):
+        """Triangular mel filters over the rFFT bins"""
+        def hz_to_mel(hz):
+            return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+        def mel_to_hz(mel):
+            return 700.0 * (10 ** (mel / 2595.0) - 1.0)
+
+        mels = np.linspace(hz_to_mel(60.0), hz_to_mel(self.rate / 2), self.N_MELS + 2)
+        bins = np.floor((self.N_FFT + 1) * mel_to_hz(mels) / self.rate).astype(int)
+        fb = np.zeros((self.N_MELS, self.N_FFT // 2 + 1), dtype=np.float32)
+        for m in range(1, self.N_MELS + 1):
+            left, center, right = bins[m - 1], bins[m], bins[m + 1]
+            if center > left:
+                fb[m - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+            if right > center:
+                fb[m - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+        return fb
+
+    def mfcc(self, pcm: bytes):
+        """(frames, coefficients) MFCC matrix"""
+        x = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+        if len(x) < self.win:
+            return np.zeros((0, self.N_CEPS - 1), dtype=np.float32)
+        x = np.append(x[0], x[1:] - 0.97 * x[:-1])  # Pre-emphasis
+        count = 1 + (len(x) - self.win) // self.hop
+        index = np.arange(self.win)[None, :] + self.hop * np.arange(count)[:, None]
+        power = np.abs(np.fft.rfft(x[index] * self.window, self.N_FFT)) ** 2 / self.N_FFT
+        ceps = np.log(power @ self.mel_fb.T + 1e-10) @ self.dct.T
+        return ceps
+
+    @staticmethod
+    def dtw_distance(template, query) -> float:
+        """Subsequence DTW: best match of the template anywhere in the query, per template frame.
+        Each template frame advances the query by 0, 1 or 2 frames, so rows vectorize."""
+        if not len(template) or not len(query):
+            return float("inf")
+        cost = np.sqrt(((template[:, None, :] - query[None, :, :]) ** 2).sum(axis=2))
+        acc = cost[0].copy()
+        for i in range(1, len(template)):
+            shift1 = np.concatenate(([np.inf], acc[:-1]))
+            shift2 = np.concatenate(([np.inf, np.inf], acc[:-2]))
+            acc = cost[i] + np.minimum(acc, np.minimum(shift1, shift2))
+        return float(acc.min()) / len(template)
+
+    def score(self, pcm: bytes) -> float:
+        """Lowest DTW distance between the audio and any enrolled template"""
+        query = self.mfcc(pcm)
+        return min(self.dtw_distance(t, query) for t in self.templates)
+
+    def detect(self, pcm: bytes):
+        """Return (fired, score) for a clip of 16 kHz 16-bit mono audio"""
+        if not self.ready:
+            return False, float("inf")
+        threshold = self.config.get('wake_word_threshold') or self.threshold
+        value = self.score(pcm)
+        return value <= threshold, value
+
+    def enroll(self, pcm: bytes):
+        """Add a recording of the wake word as a template"""
+        self.templates.append(self.mfcc(pcm))
+        self.threshold = self._auto_threshold()
+
+    def _auto_threshold(self) -> float:
+        """Accept anything as close as the enrolled samples are to each other, plus a margin"""
+        if len(self.templates) < 2:
+            return self.DEFAULT_THRESHOLD
+        distances = [self.dtw_distance(a, b) for i, a in enumerate(self.templates)
+                     for j, b in enumerate(self.templates) if i != j]
+        return float(np.max(distances)) * 2.25
+
+    def load(self):
+        """Load enrolled templates from disk"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            data = np.load(self.path)
+            self.templates = [data[key] for key in sorted(data.files) if key.startswith("template_")]
+            self.threshold = float(data["threshold"]) if "threshold" in data.files else self._auto_threshold()
+            print(f"Wake word spotter: {len(self.templates)} templates loaded")
+        except Exception as e:
+            print(f"Wake word templates could not be loaded: {e}")
+
+    def save(self):
+        """Save enrolled templates to disk"""
+        arrays = {f"template_{i:02d}": t for i, t in enumerate(self.templates)}
+        np.savez(self.path, threshold=np.float32(self.threshold or self.DEFAULT_THRESHOLD), **arrays)
+
+
+class MicrophoneStream:
+    """Single always-open microphone input stream feeding a fixed-size ring buffer"""
+
+    RATE = 16000
+    SAMPLE_WIDTH = 2
+    FRAME_SAMPLES = 320  # 20 ms at 16 kHz
+
+    def __init__(self, ring_seconds: int = 30):
+        self.ring = deque(maxlen=ring_seconds * self.RATE // self.FRAME_SAMPLES)
+        self.written = 0  # Absolute index of the next frame to be written
+        self.condition = threading.Condition()
+        self.pyaudio_instance = None
+        self.stream = None
+
+    @property
+    def active(self) -> bool:
+        return self.stream is not None
+
+    def start(self):
+        """Open the input stream (callback mode - frames arrive even while we recognize)"""
+        if self.stream is not None:
+            return
+        if self.pyaudio_instance is None:
+            self.pyaudio_instance = pyaudio.PyAudio()
+        self.stream = self.pyaudio_instance.open(
+            format=pyaudio.paInt16, channels=1, rate=self.RATE, input=True,
+            frames_per_buffer=self.FRAME_SAMPLES, stream_callback=self._on_audio
+        )
+        self.stream.start_stream()
+
+    def stop(self):
+        """Close the input stream"""
+        stream, self.stream = self.stream, None
+        if stream is not None:
+            try:
+                stream.stop_stream()
+                stream.close()
+            except Exception:
+                pass
+        with self.condition:
+            self.condition.notify_all()
+
+    def _on_audio(self, in_data, frame_count, time_info, status):
+        """PyAudio callback - push the frame into the ring buffer"""
+        with self.condition:
+            self.ring.append(in_data)
+            self.written += 1
+            self.condition.notify_all()
+        return (None, pyaudio.paContinue)
+
+    def cursor(self) -> int:
+        """Index of the newest position; readers start from here"""
+        with self.condition:
+            return self.written
+
+    def read(self, cursor: int, timeout: float = 0.5):
+        """Return (frames written since cursor, new cursor); waits up to timeout for new audio"""
+        with self.condition:
+            if self.written <= cursor:
+                self.condition.wait(timeout)
+            oldest = self.written - len(self.ring)
+            start = max(cursor, oldest)
+            frames = list(itertools.islice(self.ring, start - oldest, None))
+            return frames, self.written
+
+
+class STTBackend(ABC):
+    """Base class for speech-to-text engines; tracks its own latency"""
+
+    name = "base"
+    offline = False
+    streaming = False  # Streaming backends also provide open_stream()
+
+    def __init__(self, config: Dict, recognizer):
+        self.config = config
+        self.recognizer = recognizer
+        self.calls = 0
+        self.total_ms = 0.0
+        self.last_ms = None
+
+    @abstractmethod
+    def transcribe(self, audio) -> Tuple[str, Optional[float]]:
+        """Return (text, confidence or None); raise sr.UnknownValueError if nothing was understood"""
+
+    def recognize(self, audio) -> Tuple[str, Optional[float]]:
+        """Transcribe and record how long it took"""
+        started = time.perf_counter()
+        try:
+            return self.transcribe(audio)
+        finally:
+            self.record_latency((time.perf_counter() - started) * 1000)
+
+    def record_latency(self, elapsed_ms: float):
+        """Update latency counters for one recognition"""
+        self.last_ms = elapsed_ms
+        self.calls += 1
+        self.total_ms += elapsed_ms
+        print(f"STT[{self.name}]: {elapsed_ms:.0f} ms (avg {self.total_ms / self.calls:.0f} ms)")
+
+
+STT_BACKENDS: Dict[str, type] = {}
+
+
+def register_stt_backend(cls):
+    """Class decorator adding a backend to the registry under cls.name"""
+    STT_BACKENDS[cls.name] = cls
+    return cls
+
+
+@register_stt_backend
+class GoogleSTTBackend(STTBackend):
+    """Google Web Speech API (cloud)"""
+
+    name = "google"
+
+    def transcribe(self, audio) -> Tuple[str, Optional[float]]:
+        result = self.recognizer.recognize_google(audio, show_all=True)
+        if not result or not result.get("alternative"):
+            raise sr.UnknownValueError()
+        best = result["alternative"][0]
+        return best["transcript"], best.get("confidence")
+
+
+@register_stt_backend
+class SphinxSTTBackend(STTBackend):
+    """CMU PocketSphinx (offline, no per-utterance network cost)"""
+
+    name = "sphinx"
+    offline = True
+
+    def transcribe(self, audio) -> Tuple[str, Optional[float]]:
+        return self.recognizer.recognize_sphinx(audio), None
+
+
+@register_stt_backend
+class StubSTTBackend(STTBackend):
+    """Replays CONFIG['stt_stub_transcripts'] - for tests and offline demos"""
+
+    name = "stub"
+    offline = True
+
+    def transcribe(self, audio) -> Tuple[str, Optional[float]]:
+        transcripts = self.config.get('stt_stub_transcripts') or []
+        if not transcripts:
+            raise sr.UnknownValueError()
+        return transcripts[self.calls % len(transcripts)], 1.0
+
+
+class DeepgramStream:
+    """One streaming recognition session: audio frames go out over a WebSocket while
+    interim and final transcripts come back on a receiver thread"""
+
+    def __init__(self, config: Dict, on_interim=None):
+        self.on_interim = on_interim
+        self.finals = []
+        self.confidence = None
+        self.closed = threading.Event()
+
+        params = "encoding=linear16&sample_rate=16000&channels=1&interim_results=true&punctuate=true"
+        api_key = config.get('deepgram_api_key') or os.getenv('DEEPGRAM_API_KEY')
+        self.ws = websocket.create_connection(
+            f"{config.get('deepgram_url', 'wss://api.deepgram.com/v1/listen')}?{params}",
+            header=[f"Authorization: Token {api_key}"], timeout=10
+        )
+        threading.Thread(target=self._receive_loop, daemon=True).start()
+
+    def _receive_loop(self):
+        """Collect transcripts until the server closes the stream"""
+        try:
+            while True:
+                message = self.ws.recv()
+                if not message:
+                    break
+                result = json.loads(message)
+                if result.get("type") != "Results":
+                    continue
+                alternative = result["channel"]["alternatives"][0]
+                transcript = alternative.get("transcript", "")
+                if result.get("is_final"):
+                    if transcript:
+                        self.finals.append(transcript)
+                        self.confidence = alternative.get("confidence")
+                elif transcript and self.on_interim:
+                    self.on_interim(" ".join(self.finals + [transcript]))
+        except Exception:
+            pass  # Connection closed
+        finally:
+            self.closed.set()
+
+    def send(self, frame: bytes):
+        """Push one chunk of 16 kHz 16-bit mono audio"""
+        self.ws.send_binary(frame)
+
+    def finish(self, timeout: float = 5.0) -> Tuple[str, Optional[float]]:
+        """Signal end of audio and wait for the final transcript"""
+        try:
+            self.ws.send(json.dumps({"type": "CloseStream"}))
+            self.closed.wait(timeout)
+        finally:
+            self.abort()
+        if not self.finals:
+            raise sr.UnknownValueError()
+        return " ".join(self.finals), self.confidence
+
+    def abort(self):
+        """Drop the session without waiting for results"""
+        try:
+            self.ws.close()
+        except Exception:
+            pass
+
+
+@register_stt_backend
+class DeepgramSTTBackend(STTBackend):
+    """Deepgram streaming ASR over WebSocket (interim transcripts while speaking)"""
+
+    name = "deepgram"
+    streaming = True
 
-        # Run in separate thread to not block UI
-        thread = threading.Thread(target=_speak_thread, daemon=True)
-        thread.start()
+    def open_stream(self, on_interim=None) -> DeepgramStream:
+        """Start a live session; the caller sends frames and calls finish()"""
+        if not WEBSOCKET_AVAILABLE:
+            raise sr.RequestError("websocket-client not installed")
+        return DeepgramStream(self.config, on_interim)
 
+    def transcribe(self, audio) -> Tuple[str, Optional[float]]:
+        """Batch fallback - stream an already captured clip"""
+        pcm = audio.get_raw_data(convert_rate=16000, convert_width=2)
+        stream = self.open_stream()
+        for offset in range(0, len(pcm), 640 * 5):
+            stream.send(pcm[offset:offset + 640 * 5])
+        return stream.finish()
+
+
+class HedgedRecognizer:
+    """Runs a primary STT backend and, after a delay, a hedge backend on the same audio;
+    returns whichever confident result arrives first"""
+
+    def __init__(self, config: Dict, get_backend):
+        self.config = config
+        self.get_backend = get_backend
+        self.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="stt-hedge")
+        self.wins: Dict[str, int] = {}
+        self.races = 0
+
+    def _confident(self, confidence: Optional[float]) -> bool:
+        return confidence is None or confidence >= self.config.get('stt_hedge_min_confidence', 0.5)
+
+    def recognize(self, audio) -> Tuple[str, Optional[float]]:
+        """Race the configured backends; raises like a single backend when nobody understood"""
+        names = list(self.config.get('stt_hedge_backends', ["google", "sphinx"]))
+        started = time.perf_counter()
+        futures = {self.executor.submit(self.get_backend(names[0]).recognize, audio): names[0]}
+        delay = self.config.get('stt_hedge_delay', 0.5)
+        waiting = list(names[1:])
+
+        best = None  # (text, confidence, name) of a non-confident result, as a last resort
+        error = None
+        while futures:
+            timeout = delay if waiting else None
+            done, _ = wait(list(futures), timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                # Primary is slow - start the next hedge
+                name = waiting.pop(0)
+                futures[self.executor.submit(self.get_backend(name).recognize, audio)] = name
+                continue
+
+            for future in done:
+                name = futures.pop(future)
+                try:
+                    text, confidence = future.result()
+                except (sr.UnknownValueError, sr.RequestError) as e:
+                    error = e
+                    continue
+                if text and self._confident(confidence):
+                    for other in futures:
+                        other.cancel()  # Running calls can't be interrupted; their results are ignored
+                    self._record(name, started)
+                    return text, confidence
+                if text and (best is None or (confidence or 0) > (best[1] or 0)):
+                    best = (text, confidence, name)
+
+            # Everything started so far failed - don't wait out the delay for the next one
+            if not futures and waiting:
+                name = waiting.pop(0)
+                futures[self.executor.submit(self.get_backend(name).recognize, audio)] = name
+
+        if best is not None:
+            self._record(best[2], started)
+            return best[0], best[1]
+        raise error or sr.UnknownValueError()
+
+    def _record(self, winner: str, started: float):
+        """Log the winner, per-backend win rates and latencies (to tune the hedge delay)"""
+        self.races += 1
+        self.wins[winner] = self.wins.get(winner, 0) + 1
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        summary = []
+        for name in self.config.get('stt_hedge_backends', []):
+            backend = self.get_backend(name)
+            avg = f"{backend.total_ms / backend.calls:.0f} ms" if backend.calls else "n/a"
+            summary.append(f"{name} {self.wins.get(name, 0) / self.races:.0%} wins, avg {avg}")
+        print(f"STT hedge: {winner} won in {elapsed_ms:.0f} ms ({'; '.join(summary)})")
 
-# ============================================================================
-# SPEECH RECOGNITION ENGINE
-# ============================================================================
 
 class SpeechEngine:
     """Handles speech recognition and wake word detection"""
@@ -416,31 +2322,108 @@ class SpeechEngine:
         self.microphone = sr.Microphone() if SPEECH_AVAILABLE else None
         self.is_listening = False
         self.wake_word_active = True
-
-        # Adjust for ambient noise
-        if self.recognizer and self.microphone:
-            with self.microphone as source:
-                self.recognizer.adjust_for_ambient_noise(source, duration=1)
+        self.stt_backends: Dict[str, STTBackend] = {}
+        self.streamed_result = None  # (text, confidence) from a live streaming session
+        self.hedger = HedgedRecognizer(config, self.get_stt_backend)
+        self.async_engine = None  # Set by the window; recognition then runs as a cancellable task
+        self.pending_recognition = None
+
+        # Local endpointing - trims silence and never uploads clips without speech
+        self.vad = VoiceActivityDetector(config) if NUMPY_AVAILABLE else None
+
+        # Offline wake word spotter - only phrases containing the wake word reach cloud ASR
+        self.spotter = WakeWordSpotter(config) if NUMPY_AVAILABLE else None
+        self.wake_word_spotted = False
+        self.followup_until = 0.0
+
+        # Always-open capture stream (ring mode); legacy mode reopens the mic per phrase
+        self.mic_stream = None
+        if AUDIO_AVAILABLE and config.get('capture_mode', 'ring') == 'ring':
+            self.mic_stream = MicrophoneStream(config.get('mic_ring_seconds', 30))
+        self.mic_cursor = 0
+        self.calibration_idle = threading.Event()  # Cleared while _calibrate may hold the microphone
+        self.calibration_idle.set()
+
+    def calibrate_async(self):
+        """Measure ambient noise on a background thread (never blocks the GUI)"""
+        self.calibration_idle.clear()
+        threading.Thread(target=self._calibrate, daemon=True).start()
+
+    def _calibrate(self):
+        """Initial ambient noise calibration; afterwards the threshold adapts from the capture stream"""
+        try:
+            if not self.recognizer or not self.microphone:
+                return
+            if self.mic_stream is not None and self.mic_stream.active:
+                # Mic already open - calibrate from the last second in the ring buffer
+                frames, _ = self.mic_stream.read(max(0, self.mic_stream.cursor() - 50), timeout=0)
+                levels = [pcm_rms(frame) for frame in frames]
+                if levels:
+                    self.recognizer.energy_threshold = max(
+                        self.config.get('vad_min_energy', 300), 1.5 * sum(levels) / len(levels))
+            else:
+                with self.microphone as source:
+                    self.recognizer.adjust_for_ambient_noise(source, duration=1)
+            self.signals.status_update.emit("Microphone calibrated")
+            print(f"Mic calibrated: energy threshold {self.recognizer.energy_threshold:.0f}")
+        except Exception as e:
+            print(f"Ambient noise calibration failed: {e}")
+        finally:
+            self.calibration_idle.set()
+
+    def _adapt_threshold(self, quiet_levels):
+        """Track the noise floor from non-speech frames of the capture stream"""
+        if self.vad is not None:
+            target = self.vad.noise_floor * self.config.get('vad_energy_ratio', 3.0)
+            self.recognizer.energy_threshold = max(self.config.get('vad_min_energy', 300), target)
+        elif quiet_levels:
+            target = 1.5 * sum(quiet_levels) / len(quiet_levels)
+            self.recognizer.energy_threshold = 0.9 * self.recognizer.energy_threshold + 0.1 * target
 
     def listen_once(self) -> Optional[str]:
         """Listen for a single phrase"""
         if not self.recognizer or not self.microphone:
             return None
 
-        try:
-            with self.microphone as source:
-                self.signals.listening_started.emit()
-                audio = self.recognizer.listen(
-                    source,
-                    timeout=self.config['listening_timeout'],
-                    phrase_time_limit=self.config['phrase_time_limit']
-                )
-                self.signals.listening_stopped.emit()
+        # Legacy calibration opens the same sr.Microphone; wait for it to let go (about a second)
+        self.calibration_idle.wait()
 
-                # Recognize speech
-                text = self.recognizer.recognize_google(audio)
+        try:
+            self.streamed_result = None
+            if self.mic_stream is not None and self.mic_stream.active:
+                audio = self._capture_phrase()
+            else:
+                with self.microphone as source:
+                    self.signals.listening_started.emit()
+                    audio = self.recognizer.listen(
+                        source,
+                        timeout=self.config['listening_timeout'],
+                        phrase_time_limit=self.config['phrase_time_limit']
+                    )
+                    self.signals.listening_stopped.emit()
+
+                if self.vad is not None:
+                    audio = self._endpoint(audio)
+
+            if not self._passes_wake_gate(audio):
+                return None
+
+            # Streaming engines already transcribed while the user was talking
+            if self.streamed_result is not None:
+                text, _ = self.streamed_result
                 return text.lower()
 
+            # Recognize speech with the engine selected in settings (or race several)
+            recognize = self.hedger.recognize if self.config.get('stt_hedge', False) else self.get_stt_backend().recognize
+            if self.async_engine is not None:
+                self.pending_recognition = self.async_engine.submit(self.async_engine.transcribe(recognize, audio))
+                text, _ = self.pending_recognition.result()
+            else:
+                text, _ = recognize(audio)
+            return text.lower()
+
+        except concurrent.futures.CancelledError:
+            return None  # stop_listening() abandoned the request
         except sr.WaitTimeoutError:
             self.signals.listening_stopped.emit()
             return None
@@ -456,6 +2439,122 @@ class SpeechEngine:
             self.signals.listening_stopped.emit()
             return None
 
+    def get_stt_backend(self, name: Optional[str] = None) -> STTBackend:
+        """Backend instance for CONFIG['stt_engine'] (re-read every call so changes apply at runtime)"""
+        name = name or self.config.get('stt_engine', 'google')
+        if name not in STT_BACKENDS:
+            print(f"Unknown STT engine '{name}', using google")
+            name = "google"
+        if name not in self.stt_backends:
+            self.stt_backends[name] = STT_BACKENDS[name](self.config, self.recognizer)
+        return self.stt_backends[name]
+
+    def _passes_wake_gate(self, audio) -> bool:
+        """Run the offline spotter; False means skip cloud recognition for this phrase"""
+        self.wake_word_spotted = False
+        if not (self.wake_word_active and self.config.get('wake_word_gating', True)
+                and self.spotter is not None and self.spotter.ready):
+            return True
+        if time.time() < self.followup_until:
+            return True  # Follow-up right after the wake word
+
+        pcm = audio.get_raw_data(convert_rate=MicrophoneStream.RATE, convert_width=MicrophoneStream.SAMPLE_WIDTH)
+        fired, score = self.spotter.detect(pcm)
+        if fired:
+            self.wake_word_spotted = True
+            self.followup_until = time.time() + self.config.get('wake_word_followup_seconds', 8)
+            print(f"Wake word spotted locally (score {score:.2f})")
+        return fired
+
+    def _open_live_stream(self):
+        """Start a streaming ASR session for the phrase that just began (if the engine streams)"""
+        backend = self.get_stt_backend()
+        if not backend.streaming:
+            return None
+        if self.config.get('wake_word_gating', True) and self.spotter is not None and self.spotter.ready \
+                and time.time() >= self.followup_until:
+            return None  # Audio must pass the offline wake word gate before it leaves the device
+        try:
+            return backend.open_stream(self.signals.interim_transcript.emit)
+        except Exception as e:
+            print(f"Streaming ASR unavailable, falling back to batch: {e}")
+            return None
+
+    def _endpoint(self, audio):
+        """Trim silence from a captured phrase; reject it if there is no speech at all"""
+        pcm = audio.get_raw_data(convert_rate=MicrophoneStream.RATE, convert_width=MicrophoneStream.SAMPLE_WIDTH)
+        if not self.vad.has_speech(pcm):
+            raise sr.UnknownValueError()
+        return sr.AudioData(self.vad.trim(pcm), MicrophoneStream.RATE, MicrophoneStream.SAMPLE_WIDTH)
+
+    def _capture_phrase(self):
+        """Cut the next phrase out of the ring buffer, ending it as soon as the user stops talking"""
+        rate = MicrophoneStream.RATE
+        frame_seconds = MicrophoneStream.FRAME_SAMPLES / rate
+        pre_roll = deque(maxlen=max(1, int(0.3 / frame_seconds)))  # Keep the first syllable
+        if self.vad is not None:
+            silence_limit = self.vad.hangover_frames
+        else:
+            silence_limit = int(self.recognizer.pause_threshold / frame_seconds)
+        max_frames = int(self.config['phrase_time_limit'] / frame_seconds)
+        wait_deadline = time.time() + self.config['listening_timeout']
+
+        phrase = []
+        silent_frames = 0
+        live = None
+        while self.is_listening and self.mic_stream.active:
+            frames, self.mic_cursor = self.mic_stream.read(self.mic_cursor)
+            if self.vad is not None:
+                speech = self.vad.raw_mask(b"".join(frames))  # One vectorized pass per batch
+                self._adapt_threshold(None)
+            else:
+                levels = [pcm_rms(frame) for frame in frames]
+                speech = [level > self.recognizer.energy_threshold for level in levels]
+                self._adapt_threshold([level for level, voiced in zip(levels, speech) if not voiced])
+
+            for frame, is_speech in zip(frames, speech):
+                if not phrase:
+                    if not is_speech:
+                        pre_roll.append(frame)
+                        continue
+                    self.signals.listening_started.emit()
+                    phrase.extend(pre_roll)
+                    live = self._open_live_stream()
+                    if live is not None:
+                        live.send(b"".join(pre_roll))
+
+                phrase.append(frame)
+                if live is not None:
+                    live.send(frame)
+                silent_frames = 0 if is_speech else silent_frames + 1
+                if silent_frames >= silence_limit or len(phrase) >= max_frames:
+                    self.signals.listening_stopped.emit()
+                    pcm = b"".join(phrase)
+                    if self.vad is not None:
+                        if not self.vad.has_speech(pcm):
+                            # Click or short noise burst - keep listening, don't upload
+                            if live is not None:
+                                live.abort()
+                                live = None
+                            phrase = []
+                            silent_frames = 0
+                            continue
+                        pcm = self.vad.trim(pcm)
+                    if live is not None:
+                        started = time.perf_counter()
+                        try:
+                            self.streamed_result = live.finish()
+                        finally:
+                            self.get_stt_backend().record_latency((time.perf_counter() - started) * 1000)
+                    return sr.AudioData(pcm, rate, MicrophoneStream.SAMPLE_WIDTH)
+
+            if not phrase and time.time() > wait_deadline:
+                raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+
+        if live is not None:
+            live.abort()
+        raise sr.WaitTimeoutError("listening stopped")
+
     def check_wake_word(self, text: str) -> bool:
         """Check if text contains wake word"""
         text_lower = text.lower()
@@ -468,6 +2567,16 @@ class SpeechEngine:
         """Continuous listening loop for wake word detection"""
         self.is_listening = True
 
+        # Ring mode: open the mic once for the whole session - but not while calibration
+        # still holds the same device through sr.Microphone (about a second after startup)
+        if self.mic_stream is not None:
+            self.calibration_idle.wait()
+            try:
+                self.mic_stream.start()
+                self.mic_cursor = self.mic_stream.cursor()
+            except Exception as e:
+                print(f"Ring capture unavailable, reopening mic per phrase: {e}")
+
         while self.is_listening:
             text = self.listen_once()
 
@@ -475,21 +2584,1120 @@ class SpeechEngine:
                 self.signals.text_update.emit("user", text)
 
                 # Check for wake word
-                if self.wake_word_active and self.check_wake_word(text):
+                if self.wake_word_active and (self.wake_word_spotted or self.check_wake_word(text)):
                     self.signals.wake_word_detected.emit()
                     self.signals.status_update.emit("Wake word detected!")
 
-            time.sleep(0.1)  # Small delay to prevent CPU overuse
+            # Legacy mode only - ring mode blocks on the buffer instead
+            if self.mic_stream is None or not self.mic_stream.active:
+                time.sleep(0.1)  # Small delay to prevent CPU overuse
+
+        if self.mic_stream is not None:
+            self.mic_stream.stop()
 
     def stop_listening(self):
         """Stop the listening loop"""
         self.is_listening = False
+        if self.pending_recognition is not None:
+            self.pending_recognition.cancel()
+
+
+class BargeInMonitor:
+    """Watches the microphone while Astra speaks and interrupts playback on user speech"""
+
+    RATE = 16000
+    FRAME_SAMPLES = 320  # 20 ms at 16 kHz
+    MAX_DELAY = 10  # Speaker-to-mic delays searched, in frames (200 ms)
+    HISTORY = 100  # Frames (2 s) of mic/output levels used to fit the echo
+    MIN_REFERENCE = 1000.0  # Output level needed for a frame to say anything about the echo
+    WARMUP = 50  # Frames with output at the start of each reply that all train the echo model
+    SUSPECT = 1.2  # Later, frames this far above the predicted echo may be the user and are not trained on
+
+    def __init__(self, config: Dict, signals: SignalManager, audio_engine: AudioEngine,
+                 mic_stream: Optional[MicrophoneStream] = None):
+        self.config = config
+        self.signals = signals
+        self.audio = audio_engine
+        self.mic_stream = mic_stream  # Shared capture stream, used when it is open
+        self.running = False
+        self.pyaudio_instance = None
+        # Echo model: mic RMS ~ coupling * output RMS `delay` frames earlier (coupling near 0 with headphones)
+        self.coupling = float(config.get('barge_in_coupling', 1.0))
+        self.delay = None  # Unknown until fitted; until then the loudest recent output is used
+        self.outputs = deque(maxlen=self.HISTORY + self.MAX_DELAY + 1)
+        self.mic_levels = deque(maxlen=self.HISTORY)  # None for frames not trained on
+        self.frames_since_fit = 0
+        self.warmup = 0
+
+    def start(self):
+        """Start the monitor thread"""
+        self.running = True
+        threading.Thread(target=self._monitor_loop, daemon=True).start()
+
+    def stop(self):
+        """Stop the monitor thread"""
+        self.running = False
+
+    def _reference(self) -> float:
+        """Output level the mic should be hearing now (3-frame peak at the echo delay)"""
+        outputs = list(self.outputs)
+        if self.delay is None:
+            return max(outputs[-self.MAX_DELAY - 1:], default=0.0)
+        now = len(outputs) - 1 - self.delay
+        return max(outputs[max(0, now - 2):now + 1], default=0.0)
+
+    def _fit_echo(self):
+        """Pick the delay whose output levels best correlate with the mic, then the coupling at it"""
+        outputs = np.array(self.outputs, dtype=np.float32)
+        peaks = outputs.copy()
+        peaks[1:] = np.maximum(peaks[1:], outputs[:-1])
+        peaks[2:] = np.maximum(peaks[2:], outputs[:-2])
+        mics = np.array([np.nan if level is None else level for level in self.mic_levels], dtype=np.float32)
+        frames = len(outputs) - len(mics) + np.arange(len(mics))  # Output index of each mic frame
+
+        best = None
+        for delay in range(self.MAX_DELAY + 1):
+            index = frames - delay
+            refs = np.where(index >= 0, peaks[np.maximum(index, 0)], 0.0)
+            keep = ~np.isnan(mics) & (refs >= self.MIN_REFERENCE)
+            if np.count_nonzero(keep) < 25:
+                continue
+            mic, ref = mics[keep], refs[keep]
+            mic_dev, ref_dev = mic - mic.mean(), ref - ref.mean()
+            denominator = float(np.sqrt((mic_dev @ mic_dev) * (ref_dev @ ref_dev)))
+            correlation = float(mic_dev @ ref_dev) / denominator if denominator else 0.0
+            if best is None or correlation > best[0]:
+                best = (correlation, delay, mic / ref)
+        if best is not None:
+            _, self.delay, ratios = best
+            # 90th percentile of mic/output, so echo peaks stay under the threshold
+            self.coupling = float(np.percentile(ratios, 90))
+
+    def is_user_frame(self, mic_level: float) -> bool:
+        """True if a mic frame is louder than the echo of what Astra is playing
+
+        The echo is predicted from the playback reference: output levels are
+        correlated with mic levels of frames without user speech to find the
+        speaker-to-mic delay and the coupling (refitted every 5 frames). The
+        first second of each reply trains on every non-user frame; after that,
+        frames well above the predicted echo are left out in case they are the
+        user talking quietly.
+        """
+        self.outputs.append(self.audio.output_level)
+        reference = self._reference()
+        expected = self.coupling * reference
+        threshold = max(self.config.get('barge_in_energy', 1500),
+                        expected * self.config.get('barge_in_echo_margin', 1.5))
+        user = mic_level >= threshold
+        if reference >= self.MIN_REFERENCE:
+            self.warmup += 1
+        trusted = self.warmup <= self.WARMUP or mic_level < expected * self.SUSPECT
+        self.mic_levels.append(None if user or not trusted else mic_level)
+        self.frames_since_fit += 1
+        if self.frames_since_fit >= 5 and NUMPY_AVAILABLE:
+            self.frames_since_fit = 0
+            self._fit_echo()
+        return user
+
+    def _monitor_loop(self):
+        """Open the mic only while speaking and look for sustained voice energy above the echo"""
+        stream = None
+        cursor = None
+        voiced_frames = 0
+        while self.running:
+            # pyttsx3 output level is unknown, so there is nothing to gate on while it speaks
+            if not self.config.get('barge_in', True) or not self.audio.is_speaking or self.audio.fallback_speaking:
+                if stream is not None:
+                    stream.stop_stream()
+                    stream.close()
+                    stream = None
+                cursor = None
+                self.outputs.clear()
+                self.mic_levels.clear()
+                self.warmup = 0
+                time.sleep(0.02)
+                continue
+
+            try:
+                if self.mic_stream is not None and self.mic_stream.active:
+                    # Read from the shared ring buffer instead of opening a second stream
+                    if stream is not None:
+                        stream.stop_stream()
+                        stream.close()
+                        stream = None
+                    if cursor is None:
+                        cursor = self.mic_stream.cursor()
+                        voiced_frames = 0
+                    frames, cursor = self.mic_stream.read(cursor, timeout=0.02)
+                else:
+                    if stream is None:
+                        if self.pyaudio_instance is None:
+                            self.pyaudio_instance = pyaudio.PyAudio()
+                        stream = self.pyaudio_instance.open(
+                            format=pyaudio.paInt16, channels=1, rate=self.RATE,
+                            input=True, frames_per_buffer=self.FRAME_SAMPLES
+                        )
+                        voiced_frames = 0
+                    frames = [stream.read(self.FRAME_SAMPLES, exception_on_overflow=False)]
+
+                for frame in frames:
+                    if self.is_user_frame(pcm_rms(frame)):
+                        voiced_frames += 1
+                    else:
+                        voiced_frames = 0
+
+                    if voiced_frames >= self.config.get('barge_in_frames', 3):
+                        voiced_frames = 0
+                        print("Barge-in: user speech detected, stopping playback")
+                        self.audio.stop_speaking()
+                        self.signals.barge_in.emit()
+                        break
+
+            except Exception as e:
+                print(f"Barge-in monitor error: {e}")
+                stream = None
+                time.sleep(1)
+
+
+# ============================================================================
+# ASYNC REQUEST ENGINE
+# ============================================================================
+
+class AsyncEngine:
+    """Runs LLM, TTS and ASR requests as cancellable tasks on one asyncio loop thread
+
+    HTTP goes through a shared aiohttp session (one connection pool for Gemini
+    and Murf) when aiohttp is installed. Blocking SDKs (google-generativeai,
+    speech_recognition) run in the loop's default thread pool instead of a new
+    thread per request. Results are delivered through SignalManager.
+    """
+
+    def __init__(self, config: Dict, signals: SignalManager, audio_engine: AudioEngine):
+        self.config = config
+        self.signals = signals
+        self.audio = audio_engine
+        self.session = None
+        self.tts_slots = asyncio.Semaphore(config.get('tts_workers', 3))
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self._run, daemon=True, name="async-engine").start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro) -> concurrent.futures.Future:
+        """Schedule a coroutine from any thread; cancelling the returned future cancels the task"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    async def http(self):
+        """Shared aiohttp session (created on the loop on first use), or None without aiohttp"""
+        if not AIOHTTP_AVAILABLE:
+            return None
+        if self.session is None:
+            self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(
+                limit=self.config.get('async_pool_size', 16), keepalive_timeout=30
+            ))
+        return self.session
+
+    def close(self):
+        """Close the HTTP session and stop the loop (waits briefly so the session closes cleanly on exit)"""
+        async def shutdown():
+            if self.session is not None:
+                await self.session.close()
+        try:
+            self.submit(shutdown()).result(timeout=2)
+        except Exception as e:
+            print(f"Async engine shutdown: {e!r}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    # ---- LLM ----
+
+    async def ask(self, prompt: str, cancel_event: Optional[threading.Event] = None, stream: bool = True,
+                  generation: int = 0) -> str:
+        """Get a Gemini reply, streamed to ai_stream_chunk/ai_stream_finished (or ai_response_ready)
+
+        Non-streamed replies go through GeminiClient.generate on a worker thread,
+        so they get the same cache, hedging and retries as the threaded path.
+        """
+        client = get_gemini_client()
+        cancel_event = cancel_event or threading.Event()
+        parts = []
+        try:
+            if not stream:
+                reply = await asyncio.to_thread(client.generate, prompt)
+                if not cancel_event.is_set():
+                    self.signals.ai_response_ready.emit(generation, reply)
+                return reply
+
+            cached = client.cache.get(prompt) if client.cache is not None else None
+            if cached is not None:
+                client._remember(prompt, cached)
+                parts.append(cached)
+                self.signals.ai_stream_chunk.emit(generation, cached)
+            else:
+                started = time.perf_counter()
+                async for chunk in self._gemini_chunks(client, client._contents(prompt), cancel_event):
+                    parts.append(chunk)
+                    if not cancel_event.is_set():
+                        self.signals.ai_stream_chunk.emit(generation, chunk)
+                client._finish_stream(prompt, parts, started, cancel_event.is_set())
+
+            reply = "".join(parts)
+            if not cancel_event.is_set():
+                self.signals.ai_stream_finished.emit(generation, reply)
+            return reply
+        except asyncio.CancelledError:
+            cancel_event.set()  # Stops the worker-thread path too
+            raise
+        except Exception as e:
+            # Same contract as the worker-thread path: the turn always finishes
+            error = f"(AI Error: {str(e)})"
+            if not cancel_event.is_set():
+                if stream:
+                    parts.append(error)
+                    self.signals.ai_stream_chunk.emit(generation, error)
+                    self.signals.ai_stream_finished.emit(generation, "".join(parts))
+                else:
+                    self.signals.ai_response_ready.emit(generation, error)
+            return error
+
+    async def _gemini_chunks(self, client: GeminiClient, contents: List[Dict], cancel_event: threading.Event):
+        """Reply chunks: native aiohttp SSE on the REST path, the SDK stream in a worker thread otherwise"""
+        api_key = self.config.get('gemini_api_key') or os.getenv('GEMINI_API_KEY')
+        session = await self.http()
+        if api_key:
+            await asyncio.to_thread(client._ensure_ready, api_key)
+        if not api_key or session is None or client.model is not None:
+            chunks = client._stream(contents, cancel_event)
+            while True:
+                chunk = await asyncio.to_thread(next, chunks, None)
+                if chunk is None:
+                    return
+                yield chunk
+
+        if not client.breaker.allow():
+            yield f"(Gemini is unavailable right now. Trying again in {client.breaker.retry_in():.0f} s)"
+            return
+        try:
+            async for chunk in self._gemini_sse(client, session, api_key, contents, cancel_event):
+                yield chunk
+        finally:
+            client.breaker.release()
+
+    async def _gemini_sse(self, client: GeminiClient, session, api_key: str, contents: List[Dict],
+                          cancel_event: threading.Event):
+        """REST streaming with the client's deadlines, retries and breaker, on the shared session"""
+        attempts = StreamAttempts(client, "async-stream", cancel_event)
+        while (timeout := attempts.next_attempt()) is not None:
+            try:
+                async with session.post(
+                    client.stream_url, params={"key": api_key, "alt": "sse"}, json=client.request_body(contents),
+                    timeout=aiohttp.ClientTimeout(total=None, sock_connect=timeout, sock_read=timeout)
+                ) as response:
+                    if response.status != 200:
+                        final = attempts.failed_status(response.status, await response.text(),
+                                                       response.headers.get("Retry-After"))
+                        if final:
+                            yield final
+                            return
+                    else:
+                        async for raw in response.content:
+                            if attempts.cancelled:
+                                return
+                            for text in attempts.parse(raw.decode("utf-8")):
+                                yield text
+                        attempts.succeeded()
+                        return
+            except Exception as e:
+                final = attempts.failed(e)
+                if final:
+                    yield final
+                    return
+
+            if attempts.cancelled:
+                return
+            delay = attempts.backoff_delay()
+            if delay is None:
+                break
+            await asyncio.sleep(delay)
+
+        yield attempts.give_up()
+
+    # ---- TTS ----
+
+    async def synthesize(self, text: str):
+        """Murf audio for text as a decoded AudioSegment (None on failure)"""
+        if not PYDUB_AVAILABLE:
+            print("ERROR: pydub not available to decode Murf audio")
+            return None
+        payload, key = self.audio.murf_payload(text)
+        async with self.tts_slots:
+            audio_bytes = await asyncio.to_thread(self.audio.cache.get, key)
+            if audio_bytes is not None:
+                print("Murf TTS: Cache hit")
+            else:
+                session = await self.http()
+                if session is None:
+                    audio_bytes = await asyncio.to_thread(self.audio._fetch_murf_audio, payload)
+                else:
+                    audio_bytes = await self._fetch_murf(session, payload)
+                if audio_bytes is None:
+                    return None
+                await asyncio.to_thread(self.audio.cache.put, key, audio_bytes)
+        return await asyncio.to_thread(self.audio.decode_audio, audio_bytes)
+
+    async def _fetch_murf(self, session, payload: Dict) -> Optional[bytes]:
+        """Murf request on the shared session (inline base64 audio, or a second download)"""
+        request = self.audio.murf_request(payload)
+        if request is None:
+            return None
+        url, headers, payload = request
+        started = time.perf_counter()
+        try:
+            async with session.post(url, headers=headers, json=payload,
+                                    timeout=aiohttp.ClientTimeout(total=60)) as response:
+                print(f"Murf API status: {response.status}")
+                if response.status != 200:
+                    print(f"Murf API error {response.status}: {(await response.text())[:500]}")
+                    return None
+                result = await response.json(content_type=None)
+
+            encoded_audio = result.get('encodedAudio')
+            if encoded_audio:
+                self.audio.record_synthesis("inline", started)
+                return base64.b64decode(encoded_audio)
+
+            audio_url = result.get('audioFile')
+            if audio_url:
+                async with session.get(audio_url, timeout=aiohttp.ClientTimeout(total=30)) as audio_response:
+                    if audio_response.status == 200:
+                        audio_bytes = await audio_response.read()
+                        self.audio.record_synthesis("download", started)
+                        return audio_bytes
+            print("Murf API error: no audio in response")
+            return None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Murf TTS error: {e or type(e).__name__}")
+            return None
+
+    # ---- ASR ----
+
+    async def transcribe(self, recognize, audio) -> Tuple[str, Optional[float]]:
+        """Run an STT backend's recognize(audio) (speech_recognition is blocking) in the shared pool"""
+        return await asyncio.to_thread(recognize, audio)
+
+
+class TurnManager:
+    """Per-turn generation IDs and a bounded pool for AI work
+
+    Every user input starts a new turn; older turns still in flight are
+    cancelled and their late results are ignored, so stale answers are never
+    typed or spoken. At most ai_max_concurrent calls run at once (on the
+    asyncio engine or a thread pool); the rest wait in a queue.
+    """
+
+    def __init__(self, config: Dict, async_engine: Optional[AsyncEngine] = None):
+        limit = config.get('ai_max_concurrent', 2)
+        self.async_engine = async_engine
+        self.executor = ThreadPoolExecutor(max_workers=limit, thread_name_prefix="ai-turn")
+        self.slots = asyncio.Semaphore(limit)
+        self.generation = 0
+        self.inflight = {}  # generation -> (cancel_event, future or None)
+        self.waiting = 0  # Submitted, waiting for a slot
+        self.running = 0
+        self.dropped = 0  # Superseded by a newer turn before finishing
+        self.cancelled = 0  # Cancelled by barge-in
+        self.lock = threading.Lock()
+
+    def begin(self) -> Tuple[int, threading.Event, bool]:
+        """Start a new turn: (generation, cancel_event, whether an unfinished turn was superseded)"""
+        with self.lock:
+            self.generation += 1
+            stale = list(self.inflight.values())
+            self.inflight.clear()
+            self.dropped += len(stale)
+            cancel_event = threading.Event()
+            self.inflight[self.generation] = (cancel_event, None)
+            generation = self.generation
+        for event, future in stale:
+            event.set()
+            if future is not None:
+                future.cancel()
+        if stale:
+            print(f"AI turn {generation - 1} superseded ({self.stats_text()})")
+        return generation, cancel_event, bool(stale)
+
+    def is_current(self, generation: int) -> bool:
+        return generation == self.generation
+
+    def finish(self, generation: int):
+        """Turn produced its final result (or was abandoned)"""
+        with self.lock:
+            self.inflight.pop(generation, None)
+
+    def cancel_current(self):
+        """Abandon the current turn (e.g. the user talked over the answer)"""
+        with self.lock:
+            entry = self.inflight.pop(self.generation, None)
+            if entry is not None:
+                self.cancelled += 1
+        if entry is not None:
+            entry[0].set()
+            if entry[1] is not None:
+                entry[1].cancel()
+
+    def submit(self, generation: int, work):
+        """Run work() (blocking) or await work (a coroutine) for this turn within the concurrency limit"""
+        with self.lock:
+            if generation not in self.inflight:
+                if asyncio.iscoroutine(work):
+                    work.close()
+                return None
+            self.waiting += 1
+
+        if asyncio.iscoroutine(work) and self.async_engine is not None:
+            future = self.async_engine.submit(self._run_async(generation, work))
+        else:
+            future = self.executor.submit(self._run_blocking, generation, work)
+            future.add_done_callback(lambda f: f.cancelled() and self._unqueue())
+
+        with self.lock:
+            if generation in self.inflight:
+                self.inflight[generation] = (self.inflight[generation][0], future)
+        return future
+
+    def _unqueue(self):
+        with self.lock:
+            self.waiting -= 1
+
+    def _run_blocking(self, generation: int, work):
+        with self.lock:
+            self.waiting -= 1
+            self.running += 1
+        try:
+            if self.is_current(generation):
+                return work()
+        finally:
+            with self.lock:
+                self.running -= 1
+
+    async def _run_async(self, generation: int, work):
+        started = False
+        try:
+            async with self.slots:
+                started = True
+                with self.lock:
+                    self.waiting -= 1
+                    self.running += 1
+                try:
+                    return await work
+                finally:
+                    with self.lock:
+                        self.running -= 1
+        finally:
+            if not started:
+                self._unqueue()
+                work.close()  # Cancelled while queued - never awaited
+
+    def stats(self) -> Dict:
+        """Queue depth and drop counters"""
+        with self.lock:
+            return {
+                "generation": self.generation,
+                "queue_depth": self.waiting,
+                "running": self.running,
+                "dropped": self.dropped,
+                "cancelled": self.cancelled,
+            }
+
+    def stats_text(self) -> str:
+        stats = self.stats()
+        return (f"queue {stats['queue_depth']}, running {stats['running']}, "
+                f"dropped {stats['dropped']}, cancelled {stats['cancelled']}")
 
 
 # ============================================================================
 # COMMAND PROCESSOR
 # ============================================================================
 
+# Extended list of apps with aliases
+APP_ALIASES = {
+    "chrome": ["chrome", "google chrome"],
+    "firefox": ["firefox", "mozilla"],
+    "edge": ["edge", "microsoft edge"],
+    "notepad": ["notepad", "text editor"],
+    "calculator": ["calculator", "calc"],
+    "terminal": ["terminal", "command prompt", "cmd", "powershell"],
+    "explorer": ["explorer", "file explorer", "files", "folder"],
+    "vscode": ["vscode", "vs code", "visual studio code", "code editor"],
+    "spotify": ["spotify", "music"],
+    "settings": ["settings", "control panel"],
+    "mail": ["mail", "email", "outlook"],
+    "browser": ["browser", "internet"],
+    "word": ["word", "microsoft word"],
+    "excel": ["excel", "microsoft excel"],
+    "powerpoint": ["powerpoint", "ppt"],
+    "discord": ["discord"],
+    "slack": ["slack"],
+    "teams": ["teams", "microsoft teams"],
+    "zoom": ["zoom"],
+    "paint": ["paint", "mspaint"],
+    "photos": ["photos"],
+    "camera": ["camera"],
+    "store": ["store", "microsoft store"],
+}
+
+# Launch commands per OS (apps not listed fall back to their own name)
+APP_COMMANDS = {
+    "Windows": {
+        "chrome": "start chrome",
+        "firefox": "start firefox",
+        "edge": "start msedge",
+        "notepad": "notepad.exe",
+        "calculator": "calc.exe",
+        "browser": "start chrome",
+        "explorer": "explorer.exe",
+        "cmd": "cmd.exe",
+        "terminal": "start wt",  # Windows Terminal
+        "vscode": "code",
+        "spotify": "start spotify:",
+        "settings": "start ms-settings:",
+        "mail": "start outlookmail:",
+        "word": "start winword",
+        "excel": "start excel",
+        "powerpoint": "start powerpnt",
+        "discord": "start discord:",
+        "slack": "start slack:",
+        "teams": "start msteams:",
+        "zoom": "start zoommtg:",
+        "paint": "mspaint.exe",
+        "photos": "start ms-photos:",
+        "camera": "start microsoft.windows.camera:",
+        "store": "start ms-windows-store:",
+    },
+    "Darwin": {
+        "chrome": "Google Chrome",
+        "firefox": "Firefox",
+        "terminal": "Terminal",
+        "music": "Music",
+        "browser": "Safari",
+    },
+    "Linux": {
+        "chrome": "google-chrome",
+        "firefox": "firefox",
+        "terminal": "gnome-terminal",
+        "browser": "firefox",
+    },
+}
+
+
+class AppAliasIndex:
+    """App name lookup built once: exact alias n-grams plus character-trigram fuzzy matching
+
+    Extra apps come from a JSON file next to app.py, reloaded only when it changes:
+        {"aliases": {"obsidian": ["obsidian", "vault"]},
+         "commands": {"obsidian": "obsidian", "chrome": {"Linux": "chromium"}}}
+    """
+
+    # Words that never name an app, skipped when looking for misheard names
+    STOP_WORDS = {"open", "launch", "start", "please", "the", "a", "an", "my", "me", "for", "up",
+                  "app", "application", "can", "you", "could", "would", "now", "and", "to"}
+
+    def __init__(self, aliases: Dict[str, List[str]], commands: Dict[str, Dict[str, str]],
+                 config_path: Optional[str] = None):
+        self.base_aliases = aliases
+        self.base_commands = commands
+        self.config_path = config_path
+        self.config_mtime = None
+        self.lock = threading.Lock()
+        self._build({}, {})
+
+    @staticmethod
+    def trigrams(text: str) -> List[str]:
+        """Character trigrams with word-start padding ("crome" -> "  c", " cr", "cro", ...)"""
+        padded = f"  {text} "
+        return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+    def _build(self, extra_aliases: Dict[str, List[str]], extra_commands: Dict[str, Any]):
+        """Precompute alias tables and trigram postings"""
+        alias_to_app = {}
+        for app, aliases in list(self.base_aliases.items()) + list(extra_aliases.items()):
+            for alias in [app] + list(aliases):
+                alias_to_app[" ".join(alias.lower().split())] = app
+
+        aliases = list(alias_to_app)
+        postings = {}
+        for alias_id, alias in enumerate(aliases):
+            for gram in set(self.trigrams(alias)):
+                postings.setdefault(gram, []).append(alias_id)
+
+        commands = {os_name: dict(table) for os_name, table in self.base_commands.items()}
+        for app, command in extra_commands.items():
+            per_os = command if isinstance(command, dict) else {os_name: command for os_name in ("Windows", "Darwin", "Linux")}
+            for os_name, cmd in per_os.items():
+                commands.setdefault(os_name, {})[app] = cmd
+
+        # Swap in all tables at once so concurrent lookups never see a half-built index
+        self.alias_to_app = alias_to_app
+        self.aliases = aliases
+        self.alias_sizes = [len(set(self.trigrams(alias))) for alias in aliases]
+        self.postings = postings
+        self.commands = commands
+        self.app_aliases = {}
+        for alias, app in alias_to_app.items():
+            self.app_aliases.setdefault(app, []).append(alias)
+        self.max_alias_words = max(len(alias.split()) for alias in aliases)
+
+    def refresh(self):
+        """Rebuild from the user config file if it changed since the last build"""
+        if not self.config_path:
+            return
+        try:
+            mtime = os.path.getmtime(self.config_path)
+        except OSError:
+            mtime = None
+        if mtime == self.config_mtime:
+            return
+        with self.lock:
+            if mtime == self.config_mtime:
+                return
+            extra_aliases, extra_commands = {}, {}
+            if mtime is not None:
+                try:
+                    with open(self.config_path, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                    extra_aliases = data.get("aliases", {})
+                    extra_commands = data.get("commands", {})
+                except Exception as e:
+                    print(f"Could not load {self.config_path}: {e}")
+            self._build(extra_aliases, extra_commands)
+            self.config_mtime = mtime
+
+    def lookup(self, words: List[str]) -> Tuple[Optional[str], float]:
+        """Best app for the words of an utterance and a 0-1 confidence (1.0 = exact alias)"""
+        self.refresh()
+
+        # Exact aliases: earliest position, longest alias first ("google chrome" over "chrome")
+        for i in range(len(words)):
+            for n in range(min(self.max_alias_words, len(words) - i), 0, -1):
+                app = self.alias_to_app.get(" ".join(words[i:i + n]))
+                if app:
+                    return app, 1.0
+
+        # Fuzzy: Dice similarity of trigram sets between each candidate span and every alias
+        best_app, best_score = None, 0.0
+        runs, run = [], []
+        for word in words + [None]:
+            if word is None or word in self.STOP_WORDS:
+                if run:
+                    runs.append(run)
+                run = []
+            else:
+                run.append(word)
+        for run in runs:
+            for i in range(len(run)):
+                for n in range(1, min(self.max_alias_words, len(run) - i) + 1):
+                    span_grams = set(self.trigrams(" ".join(run[i:i + n])))
+                    shared = {}
+                    for gram in span_grams:
+                        for alias_id in self.postings.get(gram, ()):
+                            shared[alias_id] = shared.get(alias_id, 0) + 1
+                    for alias_id, count in shared.items():
+                        score = 2.0 * count / (len(span_grams) + self.alias_sizes[alias_id])
+                        if score > best_score:
+                            best_app, best_score = self.alias_to_app[self.aliases[alias_id]], score
+        return best_app, best_score
+
+    def command_for(self, app: str, os_name: str) -> Optional[str]:
+        """Launch command for app on this OS, if one is configured"""
+        self.refresh()
+        return self.commands.get(os_name, {}).get(app)
+
+    def aliases_for(self, app: str) -> List[str]:
+        """Every name the app is known by (used to find its desktop entry)"""
+        self.refresh()
+        return self.app_aliases.get(app, [app])
+
+    def apps(self) -> List[str]:
+        """All known app names"""
+        self.refresh()
+        return list(self.app_aliases)
+
+
+APP_INDEX = AppAliasIndex(
+    APP_ALIASES, APP_COMMANDS,
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), CONFIG.get("apps_file", "astra_apps.json"))
+)
+
+
+class IntentRouter:
+    """Maps an utterance to (intent, slots) using whole-word lookups
+
+    The utterance is split into words once and each word is looked up in a
+    trigger table; the earliest trigger whose slots can be filled wins, so
+    "remind me to call mom today" is a reminder and "sometimes" / "notebook"
+    no longer look like time / note.
+    """
+
+    WORD_RE = re.compile(r"[a-z0-9']+")
+
+    # intent -> trigger words (whole words only)
+    TRIGGERS = {
+        "time": ["time", "clock"],
+        "date": ["date", "today"],
+        "open": ["open"],
+        "reminder": ["remind", "reminder"],
+        "note": ["note", "write"],
+        "search": ["search", "google"],
+    }
+
+    # intent -> slot pattern; the first non-empty group is the slot value
+    SLOTS = {
+        "reminder": r"\bremind me to (.+)|\breminder to (.+)|\bset a reminder (.+)",
+        "note": r"\bwrite (?:a )?note (.+)|\btake (?:a )?note (.+)|\bnote (.+)",
+        "search": r"\bsearch for (.+)|\bgoogle (.+)|\bsearch (.+)",
+    }
+
+    def __init__(self, app_index: AppAliasIndex = APP_INDEX, app_threshold: float = 0.55):
+        self.word_to_intent = {word: intent for intent, words in self.TRIGGERS.items() for word in words}
+        self.slot_res = {intent: re.compile(pattern, re.IGNORECASE) for intent, pattern in self.SLOTS.items()}
+        self.app_index = app_index
+        self.app_threshold = app_threshold
+
+    def route(self, text: str) -> Tuple[Optional[str], Dict[str, str]]:
+        """Return (intent, slots), or (None, {}) when nothing matched (an AI query)"""
+        words = self.WORD_RE.findall(text.lower())
+        tried = set()
+        for word in words:
+            intent = self.word_to_intent.get(word)
+            if intent is None or intent in tried:
+                continue
+            tried.add(intent)
+            slots = self._fill_slots(intent, text, words)
+            if slots is not None:
+                return intent, slots
+        return None, {}
+
+    def _fill_slots(self, intent: str, text: str, words: List[str]) -> Optional[Dict[str, str]]:
+        """Slots for intent, or None if a required slot is missing"""
+        if intent == "open":
+            app, score = self.app_index.lookup(words)
+            if app is None or score < self.app_threshold:
+                return None
+            return {"app": app, "confidence": f"{score:.2f}"}
+        pattern = self.slot_res.get(intent)
+        if pattern is None:
+            return {}
+        match = pattern.search(text)
+        if not match:
+            return None
+        value = next(group for group in match.groups() if group is not None)
+        return {intent: value}
+
+
+class IntentClassifier:
+    """TF-IDF nearest-example classifier for commands the keyword router misses
+
+    Commands that take a slot (open, reminder, note, search) must start with
+    one of their command phrases; the rest of the utterance is the slot.
+    Fixed-answer questions (time, date) are scored against TF-IDF vectors over
+    word unigrams and bigrams, stacked into a NumPy matrix, and must not contain
+    words outside that intent's examples, so "what day is it tomorrow" still
+    goes to the LLM. "chat" examples soak up open-ended questions.
+    """
+
+    EXAMPLES = {
+        "time": ["what hour is it", "how late is it", "tell me the current hour",
+                 "what o'clock is it", "do you know what hour it is", "got the hour"],
+        "date": ["what day is it", "which day is it", "what's the day of the month",
+                 "what month is it", "what day of the week is it", "what's the current day"],
+        "open": ["launch", "launch the", "start up", "start the", "fire up", "fire up the",
+                 "bring up", "bring up the", "run the", "open up", "can you launch", "please start"],
+        "reminder": ["don't let me forget to", "remember to", "ping me to", "nudge me to", "remind me about"],
+        "note": ["jot down", "jot this down", "write down", "write this down", "make a note that",
+                 "note that", "save a note", "put down in my notes"],
+        "search": ["look up", "look it up", "find information about", "search the web for",
+                   "search online for", "find me", "browse for", "look for info on"],
+        "chat": ["what is the meaning of life", "tell me a joke", "explain how this works",
+                 "who was the first president", "why is the sky blue", "how do i cook rice",
+                 "what do you think about", "write a poem about", "can you help me with",
+                 "what is the capital of", "how does it work", "summarize this", "translate this",
+                 "do you remember what i said", "what should i do", "give me some ideas",
+                 "how are you", "who are you", "what can you do", "tell me about"],
+    }
+    WORD_RE = re.compile(r"[a-z0-9']+")
+    SLOT_INTENTS = ("open", "reminder", "note", "search")
+    POLITE = {"please", "can", "could", "would", "will", "you", "hey", "ok", "okay", "astra"}
+    FILLER = {"please", "astra", "hey", "now", "right", "today", "currently", "exactly", "the", "a", "me",
+              "tell", "you", "do", "know", "can", "could"}  # Allowed in a time/date question besides its own words
+
+    def __init__(self, app_index: AppAliasIndex = APP_INDEX, threshold: float = 0.6,
+                 app_threshold: float = 0.55):
+        self.app_index = app_index
+        self.threshold = threshold
+        self.app_threshold = app_threshold
+        self.matrix = None
+        self.lock = threading.Lock()
+
+        # Command phrases by first word, longest first: ("fire", "up", "the") -> "open"
+        self.phrases = {}
+        for intent in self.SLOT_INTENTS:
+            for example in self.EXAMPLES[intent]:
+                phrase = tuple(self._strip_polite(self.WORD_RE.findall(example)))
+                self.phrases.setdefault(phrase[0], []).append((phrase, intent))
+        for candidates in self.phrases.values():
+            candidates.sort(key=lambda item: -len(item[0]))
+        self.intent_words = {
+            intent: {word for example in examples for word in self.WORD_RE.findall(example)} | self.FILLER
+            for intent, examples in self.EXAMPLES.items()
+        }
+
+    @classmethod
+    def _strip_polite(cls, words: List[str]) -> List[str]:
+        start = 0
+        while start < len(words) - 1 and words[start] in cls.POLITE:
+            start += 1
+        return words[start:]
+
+    def _anchored(self, words: List[str]) -> Tuple[Optional[str], int]:
+        """Slot intent whose command phrase opens the utterance, and where the slot starts"""
+        for phrase, intent in self.phrases.get(words[0] if words else "", []):
+            if tuple(words[:len(phrase)]) == phrase:
+                return intent, len(phrase)
+        return None, 0
+
+    @classmethod
+    def features(cls, text: str) -> List[str]:
+        """Word unigrams and bigrams"""
+        words = cls.WORD_RE.findall(text.lower())
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def _build(self):
+        """Vectorize the examples once (first use, so startup doesn't pay for NumPy)"""
+        with self.lock:
+            if self.matrix is not None:
+                return
+            labels, docs = [], []
+            for intent, examples in self.EXAMPLES.items():
+                for example in examples:
+                    labels.append(intent)
+                    docs.append(self.features(example))
+
+            document_frequency = {}
+            for doc in docs:
+                for feature in set(doc):
+                    document_frequency[feature] = document_frequency.get(feature, 0) + 1
+            self.vocabulary = {feature: i for i, feature in enumerate(document_frequency)}
+            self.idf = np.array([
+                math.log((1 + len(docs)) / (1 + document_frequency[feature])) + 1.0
+                for feature in self.vocabulary
+            ], dtype=np.float32)
+            self.unknown_idf = math.log(1 + len(docs)) + 1.0  # Unseen words count as maximally rare
+
+            matrix = np.zeros((len(docs), len(self.vocabulary)), dtype=np.float32)
+            for row, doc in enumerate(docs):
+                for feature in doc:
+                    matrix[row, self.vocabulary[feature]] += 1.0
+            matrix *= self.idf
+            matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+            self.labels = labels
+            self.matrix = matrix
+
+    def score(self, text: str) -> Tuple[str, float]:
+        """Best intent (possibly "chat") and its cosine similarity"""
+        if self.matrix is None:
+            self._build()
+        vector = np.zeros(len(self.vocabulary), dtype=np.float32)
+        unknown = 0.0
+        for feature in self.features(text):
+            index = self.vocabulary.get(feature)
+            if index is None:
+                unknown += self.unknown_idf ** 2
+            else:
+                vector[index] += 1.0
+        vector *= self.idf
+        norm = math.sqrt(float(vector @ vector) + unknown)
+        if norm == 0.0:
+            return "chat", 0.0
+        similarities = self.matrix @ vector
+        best = int(np.argmax(similarities))
+        return self.labels[best], float(similarities[best]) / norm
+
+    def classify(self, text: str) -> Tuple[Optional[str], Dict[str, str]]:
+        """(intent, slots) for a confident command match, else (None, {}) for the LLM"""
+        words = self._strip_polite(self.WORD_RE.findall(text.lower()))
+
+        # Slot commands: the command phrase must open the utterance ("jot down | buy milk")
+        intent, start = self._anchored(words)
+        if intent is not None:
+            slot = words[start:]
+            if not slot:
+                return None, {}
+            if intent == "open":
+                app, score = self.app_index.lookup(slot)
+                if app is None or score < self.app_threshold:
+                    return None, {}
+                return intent, {"app": app, "confidence": f"{score:.2f}"}
+            return intent, {intent: " ".join(slot)}
+
+        # Fixed answers: close to an example and nothing the answer would ignore
+        if not NUMPY_AVAILABLE or not words:
+            return None, {}
+        intent, similarity = self.score(text)
+        if intent == "chat" or intent in self.SLOT_INTENTS or similarity < self.threshold:
+            return None, {}
+        if any(word not in self.intent_words[intent] for word in words):
+            return None, {}
+        return intent, {}
+
+
+class AppLauncher:
+    """Resolves app commands to executables once and launches them without a shell
+
+    Resolution (PATH lookup, .desktop entries on Linux) is cached per command;
+    launches run on a worker thread and the real outcome is reported through
+    signals.app_launch_result.
+    """
+
+    DESKTOP_DIRS = [
+        os.path.expanduser("~/.local/share/applications"),
+        "/usr/local/share/applications",
+        "/usr/share/applications",
+        "/var/lib/flatpak/exports/share/applications",
+        "/var/lib/snapd/desktop/applications",
+    ]
+    LAUNCH_CHECK_SECONDS = 1.0  # A launcher exiting with an error within this window counts as a failure
+
+    def __init__(self, signals, app_index: AppAliasIndex = APP_INDEX, os_name: Optional[str] = None):
+        self.signals = signals
+        self.app_index = app_index
+        self.os_name = os_name or platform.system()
+        self.cache = {}  # (app, command) -> launch target, or None if not installed
+        self.desktop_entries = None  # lowercase name -> argv
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="app-launcher")
+
+    def warm(self):
+        """Resolve every known app in the background so the first launch is instant"""
+        self.executor.submit(lambda: [self.resolve(app) for app in self.app_index.apps()])
+
+    def resolve(self, app: str):
+        """Launch target for app: ("argv", [...]), ("startfile", target), or None if not installed"""
+        command = self.app_index.command_for(app, self.os_name)
+        key = (app, command)
+        with self.lock:
+            if key in self.cache:
+                return self.cache[key]
+        target = self._resolve(app, command)
+        with self.lock:
+            self.cache[key] = target
+        return target
+
+    def _resolve(self, app: str, command: Optional[str]):
+        if self.os_name == "Windows":
+            command = command or f"start {app}"
+            if command.startswith("start "):
+                # URI schemes and App Paths entries: ShellExecute, no cmd.exe
+                return ("startfile", command[len("start "):])
+            argv = shlex.split(command, posix=False)
+            executable = shutil.which(argv[0])
+            return ("argv", [executable] + argv[1:]) if executable else ("startfile", command)
+
+        if self.os_name == "Darwin":
+            # `open -a` searches LaunchServices and exits non-zero at once if the app is missing
+            opener = shutil.which("open")
+            return ("argv", [opener, "-a", command or app]) if opener else None
+
+        # Linux and other Unix: PATH first, then desktop entries by any of the app's names
+        for candidate in ([command] if command else []) + [app]:
+            argv = shlex.split(candidate)
+            executable = shutil.which(argv[0]) if argv else None
+            if executable:
+                return ("argv", [executable] + argv[1:])
+        entries = self._load_desktop_entries()
+        for name in [app] + self.app_index.aliases_for(app):
+            argv = entries.get(name.lower())
+            if argv:
+                return ("argv", argv)
+        return None
+
+    def _load_desktop_entries(self) -> Dict[str, List[str]]:
+        """Parse .desktop files once: Name and file stem -> Exec argv (field codes removed)"""
+        if self.desktop_entries is not None:
+            return self.desktop_entries
+        entries = {}
+        for folder in self.DESKTOP_DIRS:
+            if not os.path.isdir(folder):
+                continue
+            for filename in sorted(os.listdir(folder)):
+                if not filename.endswith(".desktop"):
+                    continue
+                fields = {}
+                in_entry = False
+                try:
+                    with open(os.path.join(folder, filename), "r", encoding="utf-8", errors="ignore") as f:
+                        for line in f:
+                            line = line.strip()
+                            if line.startswith("["):
+                                in_entry = line == "[Desktop Entry]"
+                            elif in_entry and "=" in line:
+                                key, value = line.split("=", 1)
+                                fields.setdefault(key.strip(), value.strip())
+                except OSError:
+                    continue
+                if fields.get("Hidden", "").lower() == "true" or "Exec" not in fields:
+                    continue
+                try:
+                    argv = [arg for arg in shlex.split(fields["Exec"]) if not arg.startswith("%")]
+                except ValueError:
+                    continue
+                executable = shutil.which(argv[0]) if argv else None
+                if not executable:
+                    continue
+                argv[0] = executable
+                for name in (fields.get("Name", ""), filename[:-len(".desktop")].split(".")[-1]):
+                    if name:
+                        entries.setdefault(name.lower(), argv)
+        self.desktop_entries = entries
+        return entries
+
+    def launch(self, app: str) -> bool:
+        """Queue a launch; False if the app is not installed (nothing is started)"""
+        target = self.resolve(app)
+        if target is None:
+            return False
+        self.executor.submit(self._launch, app, target)
+        return True
+
+    def _launch(self, app: str, target):
+        """Start the app on the worker thread and report what really happened"""
+        kind, value = target
+        try:
+            if kind == "startfile":
+                os.startfile(value)
+            else:
+                print(f"Opening app: {value}")
+                process = subprocess.Popen(
+                    value, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL, start_new_session=(self.os_name != "Windows")
+                )
+                try:
+                    code = process.wait(timeout=self.LAUNCH_CHECK_SECONDS)
+                except subprocess.TimeoutExpired:
+                    code = 0  # Still running: the app is up
+                if code != 0:
+                    raise RuntimeError(f"exited with status {code}")
+            ok, message = True, f"Opened {app}"
+        except Exception as e:
+            print(f"Error opening app: {e}")
+            ok, message = False, f"Could not open {app}: {e}"
+            with self.lock:
+                # Re-resolve next time in case the app was moved or uninstalled
+                self.cache = {key: value for key, value in self.cache.items() if key[0] != app}
+        if self.signals:
+            self.signals.app_launch_result.emit(app, ok, message)
+
+
 class CommandProcessor:
     """Processes voice commands and executes actions"""
 
@@ -498,37 +3706,44 @@ class CommandProcessor:
         self.signals = signals
         self.audio = audio_engine
         self.os_name = platform.system()
+        self.router = IntentRouter(APP_INDEX, config.get('app_match_threshold', 0.55))
+        self.classifier = IntentClassifier(
+            APP_INDEX, config.get('intent_classifier_threshold', 0.6), config.get('app_match_threshold', 0.55)
+        )
+        self.launcher = AppLauncher(signals, APP_INDEX, self.os_name)
+        self.launcher.warm()
 
     def process_command(self, text: str) -> str:
         """Process command and return response"""
-        text_lower = text.lower()
+        intent, slots = self.router.route(text)
+        if intent is None and self.config.get('intent_classifier', True):
+            intent, slots = self.classifier.classify(text)
 
         # Time commands
-        if any(word in text_lower for word in ["time", "clock"]):
+        if intent == "time":
             current_time = datetime.datetime.now().strftime("%I:%M %p")
             response = f"The current time is {current_time}"
-            MEMORY['logs'].append({"time": datetime.datetime.now().isoformat(), "command": text, "response": response})
+            COMMAND_LOG.append(text, response)
             return response
 
         # Date commands
-        if any(word in text_lower for word in ["date", "today"]):
+        if intent == "date":
             current_date = datetime.datetime.now().strftime("%B %d, %Y")
             response = f"Today is {current_date}"
-            MEMORY['logs'].append({"time": datetime.datetime.now().isoformat(), "command": text, "response": response})
+            COMMAND_LOG.append(text, response)
             return response
 
         # Open applications
-        if "open" in text_lower:
-            app = self._extract_app_name(text_lower)
-            if app:
-                success = self._open_application(app)
-                response = f"Opening {app}" if success else f"Could not open {app}"
-                MEMORY['logs'].append({"time": datetime.datetime.now().isoformat(), "command": text, "response": response})
-                return response
+        if intent == "open":
+            app = slots["app"]
+            queued = self._open_application(app)
+            response = f"Opening {app}" if queued else f"Could not find {app} on this computer"
+            COMMAND_LOG.append(text, response)
+            return response
 
         # Reminder commands
-        if "remind" in text_lower or "reminder" in text_lower:
-            reminder_text = self._extract_reminder(text)
+        if intent == "reminder":
+            reminder_text = slots["reminder"]
             if reminder_text:
                 MEMORY['reminders'].append({
                     "text": reminder_text,
@@ -546,12 +3761,12 @@ class CommandProcessor:
                     pass
                 
                 response = f"Reminder set: {reminder_text}"
-                MEMORY['logs'].append({"time": datetime.datetime.now().isoformat(), "command": text, "response": response})
+                COMMAND_LOG.append(text, response)
                 return response
 
         # Note commands
-        if "note" in text_lower or "write" in text_lower:
-            note_text = self._extract_note(text)
+        if intent == "note":
+            note_text = slots["note"]
             if note_text:
                 # Save to memory
                 MEMORY['notes'].append({
@@ -569,161 +3784,26 @@ class CommandProcessor:
                 except Exception as e:
                     response = f"Note saved to memory but file save failed: {e}"
                 
-                MEMORY['logs'].append({"time": datetime.datetime.now().isoformat(), "command": text, "response": response})
+                COMMAND_LOG.append(text, response)
                 return response
 
         # Search commands
-        if "search" in text_lower or "google" in text_lower:
-            query = self._extract_search_query(text)
+        if intent == "search":
+            query = slots["search"]
             if query:
                 self._search_web(query)
                 response = f"Searching for {query}"
-                MEMORY['logs'].append({"time": datetime.datetime.now().isoformat(), "command": text, "response": response})
+                COMMAND_LOG.append(text, response)
                 return response
 
         # Default response
         response = "I'm processing your request. How else can I help you?"
-        MEMORY['logs'].append({"time": datetime.datetime.now().isoformat(), "command": text, "response": response})
+        COMMAND_LOG.append(text, response)
         return response
 
-    def _extract_app_name(self, text: str) -> Optional[str]:
-        """Extract application name from command"""
-        # Extended list of apps with aliases
-        app_aliases = {
-            "chrome": ["chrome", "google chrome"],
-            "firefox": ["firefox", "mozilla"],
-            "edge": ["edge", "microsoft edge"],
-            "notepad": ["notepad", "text editor"],
-            "calculator": ["calculator", "calc"],
-            "terminal": ["terminal", "command prompt", "cmd", "powershell"],
-            "explorer": ["explorer", "file explorer", "files", "folder"],
-            "vscode": ["vscode", "vs code", "visual studio code", "code editor"],
-            "spotify": ["spotify", "music"],
-            "settings": ["settings", "control panel"],
-            "mail": ["mail", "email", "outlook"],
-            "browser": ["browser", "internet"],
-            "word": ["word", "microsoft word"],
-            "excel": ["excel", "microsoft excel"],
-            "powerpoint": ["powerpoint", "ppt"],
-            "discord": ["discord"],
-            "slack": ["slack"],
-            "teams": ["teams", "microsoft teams"],
-            "zoom": ["zoom"],
-            "paint": ["paint", "mspaint"],
-            "photos": ["photos"],
-            "camera": ["camera"],
-            "store": ["store", "microsoft store"],
-        }
-        
-        for app, aliases in app_aliases.items():
-            for alias in aliases:
-                if alias in text:
-                    return app
-        return None
-
     def _open_application(self, app: str) -> bool:
-        """Open application based on OS"""
-        try:
-            if self.os_name == "Windows":
-                # Windows app paths and commands
-                app_map = {
-                    "chrome": "start chrome",
-                    "firefox": "start firefox",
-                    "edge": "start msedge",
-                    "notepad": "notepad.exe",
-                    "calculator": "calc.exe",
-                    "browser": "start chrome",
-                    "explorer": "explorer.exe",
-                    "cmd": "cmd.exe",
-                    "terminal": "start wt",  # Windows Terminal
-                    "vscode": "code",
-                    "spotify": "start spotify:",
-                    "settings": "start ms-settings:",
-                    "mail": "start outlookmail:",
-                    "word": "start winword",
-                    "excel": "start excel",
-                    "powerpoint": "start powerpnt",
-                    "discord": "start discord:",
-                    "slack": "start slack:",
-                    "teams": "start msteams:",
-                    "zoom": "start zoommtg:",
-                    "paint": "mspaint.exe",
-                    "photos": "start ms-photos:",
-                    "camera": "start microsoft.windows.camera:",
-                    "store": "start ms-windows-store:",
-                }
-                cmd = app_map.get(app, f"start {app}")
-                print(f"Opening app with command: {cmd}")
-                subprocess.Popen(cmd, shell=True)
-                return True
-
-            elif self.os_name == "Darwin":  # macOS
-                app_map = {
-                    "chrome": "Google Chrome",
-                    "firefox": "Firefox",
-                    "terminal": "Terminal",
-                    "music": "Music",
-                    "browser": "Safari",
-                }
-                app_name = app_map.get(app, app)
-                subprocess.Popen(["open", "-a", app_name])
-                return True
-
-            elif self.os_name == "Linux":
-                app_map = {
-                    "chrome": "google-chrome",
-                    "firefox": "firefox",
-                    "terminal": "gnome-terminal",
-                    "browser": "firefox",
-                }
-                cmd = app_map.get(app, app)
-                subprocess.Popen(cmd, shell=True)
-                return True
-
-        except Exception as e:
-            print(f"Error opening app: {e}")
-            return False
-
-        return False
-
-    def _extract_reminder(self, text: str) -> Optional[str]:
-        """Extract reminder text from command"""
-        patterns = [
-            r"remind me to (.+)",
-            r"reminder to (.+)",
-            r"set a reminder (.+)",
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(1)
-        return None
-
-    def _extract_note(self, text: str) -> Optional[str]:
-        """Extract note text from command"""
-        patterns = [
-            r"write (?:a )?note (.+)",
-            r"note (.+)",
-            r"take (?:a )?note (.+)",
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(1)
-        return None
-
-    def _extract_search_query(self, text: str) -> Optional[str]:
-        """Extract search query from command"""
-        patterns = [
-            r"search for (.+)",
-            r"google (.+)",
-            r"search (.+)",
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(1)
-        return None
+        """Launch app in the background; False if it is not installed"""
+        return self.launcher.launch(app)
 
     def _search_web(self, query: str):
         """Open web browser with search query"""
@@ -808,6 +3888,14 @@ class TypingTextEdit(QTextEdit):
                 self.on_complete_callback()
                 self.on_complete_callback = None
 
+    def append_stream(self, text: str):
+        """Insert streamed text immediately at the end (no typing animation)"""
+        cursor = self.textCursor()
+        cursor.movePosition(cursor.MoveOperation.End)
+        self.setTextCursor(cursor)
+        self.insertPlainText(text)
+        self.ensureCursorVisible()
+
     def set_typing_speed(self, speed: int):
         """Set typing speed in ms"""
         self.typing_speed = speed
@@ -825,24 +3913,37 @@ class AstraWindow(QMainWindow):
         self.config = CONFIG
         self.current_theme = THEMES[self.config['theme']]
 
-        # Initialize engines
+        # Initialize engines (heavy ones are built by warm_up_engines() after first paint)
         self.signals = SignalManager()
         self.audio_engine = AudioEngine(self.config)
-        self.speech_engine = SpeechEngine(self.config, self.signals) if SPEECH_AVAILABLE else None
+        self.speech_engine = None
         self.command_processor = CommandProcessor(self.config, self.signals, self.audio_engine)
+        self.async_engine = AsyncEngine(self.config, self.signals, self.audio_engine) \
+            if self.config.get('async_engine', True) else None
+        self.audio_engine.async_engine = self.async_engine
+        self.turns = TurnManager(self.config, self.async_engine)
+        self.engine_states = {"LLM": "loading", "TTS": "loading", "STT": "loading"}
 
         # Connect signals
         self.signals.text_update.connect(self.on_text_update)
         self.signals.status_update.connect(self.on_status_update)
+        self.signals.interim_transcript.connect(self.on_interim_transcript)
         self.signals.wake_word_detected.connect(self.on_wake_word)
         self.signals.listening_started.connect(self.on_listening_started)
         self.signals.listening_stopped.connect(self.on_listening_stopped)
         self.signals.error_occurred.connect(self.on_error)
         self.signals.ai_response_ready.connect(self.on_ai_response)
+        self.signals.ai_stream_chunk.connect(self.on_ai_stream_chunk)
+        self.signals.ai_stream_finished.connect(self.on_ai_stream_finished)
+        self.signals.barge_in.connect(self.on_barge_in)
+        self.signals.engine_status.connect(self.on_engine_status)
+        self.signals.app_launch_result.connect(self.on_app_launch_result)
+        self.barge_in_monitor = None
 
         # UI state
         self.speak_mode = False
         self.is_listening = False
+        self.stream_started = False
 
         # Setup UI
         self.init_ui()
@@ -895,6 +3996,12 @@ class AstraWindow(QMainWindow):
         self.status_label.setFont(QFont("Arial", 14))
         layout.addWidget(self.status_label)
 
+        # Engine readiness (LLM / TTS / STT)
+        self.engine_label = QLabel()
+        self.engine_label.setFont(QFont("Arial", 11))
+        self.update_engine_label()
+        layout.addWidget(self.engine_label)
+
         # Wake word indicator
         self.wake_indicator = QLabel("●")
         self.wake_indicator.setFont(QFont("Arial", 24))
@@ -1261,11 +4368,85 @@ class AstraWindow(QMainWindow):
             else:
                 self.wake_indicator.setStyleSheet(f"color: {self.current_theme['accent']}; font-size: 28px;")
 
+    def warm_up_engines(self):
+        """Import heavy modules and build engines on background threads (call after first paint)"""
+        def warm(name, init):
+            started = time.perf_counter()
+            try:
+                ok = init()
+            except Exception as e:
+                print(f"{name} engine initialization failed: {e}")
+                ok = False
+            PROFILER.record(f"init {name} engine", time.perf_counter() - started)
+            self.signals.engine_status.emit(name, "ready" if ok else "unavailable")
+
+        for name, init in (("STT", self._init_stt), ("TTS", self._init_tts), ("LLM", self._init_llm)):
+            threading.Thread(target=warm, args=(name, init), daemon=True).start()
+
+    def _init_stt(self) -> bool:
+        """Build the speech engine (imports speech_recognition, pyaudio, numpy)"""
+        if not SPEECH_AVAILABLE:
+            return False
+        self.speech_engine = SpeechEngine(self.config, self.signals)
+        self.speech_engine.async_engine = self.async_engine
+        return True
+
+    def _init_tts(self) -> bool:
+        """Import audio decoding/playback modules used by the Murf path"""
+        if not PYDUB_AVAILABLE:
+            return False
+        pydub.AudioSegment
+        if AUDIO_AVAILABLE:
+            pyaudio.PyAudio
+        return True
+
+    def _init_llm(self) -> bool:
+        """Configure the shared Gemini client (imports google.generativeai)"""
+        api_key = self.config.get('gemini_api_key') or os.getenv('GEMINI_API_KEY')
+        if not api_key:
+            return False
+        get_gemini_client()._ensure_ready(api_key)
+        return True
+
+    def on_engine_status(self, name: str, state: str):
+        """Engine finished (or failed) background initialization"""
+        self.engine_states[name] = state
+        self.update_engine_label()
+
+        if name == "STT":
+            # Interrupt speech (and the in-flight AI turn) when the user talks over Astra
+            if AUDIO_AVAILABLE and self.barge_in_monitor is None:
+                self.barge_in_monitor = BargeInMonitor(
+                    self.config, self.signals, self.audio_engine,
+                    self.speech_engine.mic_stream if self.speech_engine else None
+                )
+                self.barge_in_monitor.start()
+            # Calibrate the mic in the background now that the engine exists
+            if self.speech_engine:
+                self.speech_engine.calibrate_async()
+
+        if "loading" not in self.engine_states.values():
+            PROFILER.mark("all engines ready")
+            PROFILER.report()
+
+    def update_engine_label(self):
+        """Show per-engine readiness in the header"""
+        symbols = {"loading": "○", "ready": "●", "unavailable": "✕"}
+        self.engine_label.setText("  ".join(
+            f"{name} {symbols[state]}" for name, state in self.engine_states.items()
+        ))
+        self.engine_label.setToolTip("\n".join(
+            f"{name}: {state}" for name, state in self.engine_states.items()
+        ))
+
     def toggle_listening(self):
         """Toggle voice listening"""
         if not SPEECH_AVAILABLE:
             QMessageBox.warning(self, "Error", "Speech recognition not available. Please install speech_recognition.")
             return
+        if self.speech_engine is None:
+            self.status_label.setText("Speech engine still loading...")
+            return
 
         if not self.is_listening:
             self.is_listening = True
@@ -1293,6 +4474,7 @@ class AstraWindow(QMainWindow):
             self.speak_button.setText("🔊 Speak Mode: ON")
         else:
             self.speak_button.setText("🔊 Speak Mode: OFF")
+            self.audio_engine.stop_speaking()
 
     def on_text_submit(self):
         """Handle text input submission"""
@@ -1306,6 +4488,14 @@ class AstraWindow(QMainWindow):
     def process_user_input(self, text: str):
         """Process user input and generate response"""
 
+        # A new input supersedes any AI turn still in flight
+        generation, cancel_event, superseded = self.turns.begin()
+        if superseded:
+            if self.stream_started:
+                self.stream_started = False
+                self.conversation_display.append_stream(" [interrupted]\n")
+            self.audio_engine.stop_speaking()
+
         # Display user input
         self.conversation_display.append(f"\n{'='*60}\n")
         self.conversation_display.append(f"You said: {text}\n")
@@ -1320,6 +4510,34 @@ class AstraWindow(QMainWindow):
             None
         ]:
             self.conversation_display.append("Astra: (Thinking...)\n")
+            stream = self.config.get('stream_responses', True)
+            self.stream_started = False
+
+            if self.async_engine is not None:
+                # Cancellable task on the asyncio engine; results come back through the AI signals
+                self.turns.submit(generation, self.async_engine.ask(text, cancel_event, stream, generation))
+                MEMORY['commands_executed'] += 1
+                return
+
+            if stream:
+
+                # Stream AI reply in background thread, pushing chunks to the UI
+                def stream_ai():
+                    parts = []
+                    try:
+                        for chunk in get_gemini_client().stream(text, cancel_event):
+                            parts.append(chunk)
+                            self.signals.ai_stream_chunk.emit(generation, chunk)
+                    except Exception as e:
+                        error = f"(AI Error: {str(e)})"
+                        parts.append(error)
+                        self.signals.ai_stream_chunk.emit(generation, error)
+                    if not cancel_event.is_set():
+                        self.signals.ai_stream_finished.emit(generation, "".join(parts))
+
+                self.turns.submit(generation, stream_ai)
+                MEMORY['commands_executed'] += 1
+                return
 
             # Ask AI in background thread so UI doesn't freeze
             def fetch_ai():
@@ -1329,13 +4547,15 @@ class AstraWindow(QMainWindow):
                     ai_reply = f"(AI Error: {str(e)})"
 
                 # Emit signal to update UI from main thread (thread-safe)
-                self.signals.ai_response_ready.emit(ai_reply)
+                if not cancel_event.is_set():
+                    self.signals.ai_response_ready.emit(generation, ai_reply)
 
-            threading.Thread(target=fetch_ai, daemon=True).start()
+            self.turns.submit(generation, fetch_ai)
             MEMORY['commands_executed'] += 1
             return
 
-        # If it WAS a command: display normal response
+        # If it WAS a command: answered already, so nothing of this turn is left in flight
+        self.turns.finish(generation)
         self.conversation_display.append("Astra: ")
         self.conversation_display.type_text(response + "\n")
 
@@ -1344,6 +4564,7 @@ class AstraWindow(QMainWindow):
             self.audio_engine.speak(response)
 
         MEMORY['commands_executed'] += 1
+        PROFILER.first_command()
 
     def on_text_update(self, role: str, text: str):
         """Handle text update signal"""
@@ -1354,6 +4575,18 @@ class AstraWindow(QMainWindow):
         """Handle status update signal"""
         self.status_label.setText(status)
 
+    def on_interim_transcript(self, text: str):
+        """Show what the streaming recognizer has heard so far"""
+        self.status_label.setText(f"Hearing: {text[-60:]}")
+
+    def on_app_launch_result(self, app: str, ok: bool, message: str):
+        """Report whether an app launch really worked (correcting "Opening X" on failure)"""
+        self.status_label.setText(message)
+        if not ok:
+            self.conversation_display.append(f"Astra: {message}\n")
+            if self.speak_mode:
+                self.audio_engine.speak(message)
+
     def on_wake_word(self):
         """Handle wake word detection"""
         self.wake_indicator.setStyleSheet(f"color: {self.current_theme['accent']}; font-size: 32px;")
@@ -1374,8 +4607,12 @@ class AstraWindow(QMainWindow):
         """Handle error"""
         QMessageBox.warning(self, "Error", error)
 
-    def on_ai_response(self, ai_reply: str):
+    def on_ai_response(self, generation: int, ai_reply: str):
         """Handle AI response from background thread (thread-safe UI update)"""
+        if not self.turns.is_current(generation):
+            return  # Superseded turn
+        self.turns.finish(generation)
+        PROFILER.first_command()
         self.conversation_display.append("Astra: ")
         self.conversation_display.type_text(ai_reply + "\n")
 
@@ -1383,6 +4620,42 @@ class AstraWindow(QMainWindow):
         if self.speak_mode:
             self.audio_engine.speak(ai_reply)
 
+    def on_ai_stream_chunk(self, generation: int, chunk: str):
+        """Show streamed AI text as soon as each chunk arrives"""
+        if not self.turns.is_current(generation) or generation not in self.turns.inflight:
+            return  # Superseded or interrupted turn
+        if not self.stream_started:
+            self.stream_started = True
+            self.conversation_display.append("Astra: ")
+        self.conversation_display.append_stream(chunk)
+
+        # Start speaking finished sentences while the rest is still generating
+        if self.speak_mode:
+            self.audio_engine.pipeline.feed(chunk)
+
+    def on_ai_stream_finished(self, generation: int, ai_reply: str):
+        """Finish a streamed AI reply"""
+        if not self.turns.is_current(generation) or generation not in self.turns.inflight:
+            return  # Superseded or interrupted turn
+        self.turns.finish(generation)
+        PROFILER.first_command()
+        if not self.stream_started:
+            self.conversation_display.append("Astra: ")
+        self.stream_started = False
+        self.conversation_display.append_stream("\n")
+
+        # Flush the last sentence of the spoken reply
+        if self.speak_mode:
+            self.audio_engine.pipeline.finish()
+
+    def on_barge_in(self):
+        """User spoke over Astra - abandon the current reply"""
+        self.turns.cancel_current()
+        if self.stream_started:
+            self.stream_started = False
+            self.conversation_display.append_stream(" [interrupted]\n")
+        self.status_label.setText("Listening..." if self.is_listening else "Ready")
+
     def show_reminders(self):
         """Show reminders dialog"""
         dialog = RemindersDialog(self)
@@ -1521,12 +4794,12 @@ class LogsDialog(QDialog):
         layout.addLayout(button_layout)
 
     def load_logs(self):
-        """Load logs from memory"""
+        """Load the most recent logs (including earlier sessions)"""
         self.logs_display.clear()
-        for log in MEMORY['logs']:
-            time_str = log['time'][:19]
-            command = log['command']
-            response = log['response']
+        for log in COMMAND_LOG.records():
+            time_str = datetime.datetime.fromtimestamp(log['t']).strftime("%Y-%m-%d %H:%M:%S")
+            command = log['c']
+            response = log['r']
             self.logs_display.append(f"[{time_str}]")
             self.logs_display.append(f"  Command: {command}")
             self.logs_display.append(f"  Response: {response}")
@@ -1534,7 +4807,7 @@ class LogsDialog(QDialog):
 
     def clear_logs(self):
         """Clear all logs"""
-        MEMORY['logs'].clear()
+        COMMAND_LOG.clear()
         self.load_logs()
 
 
@@ -1638,7 +4911,7 @@ class SettingsDialog(QDialog):
         # STT Engine
         layout.addWidget(QLabel("Speech Recognition Engine:"), row, 0)
         self.stt_combo = QComboBox()
-        self.stt_combo.addItems(["google", "sphinx"])
+        self.stt_combo.addItems(list(STT_BACKENDS.keys()))
         self.stt_combo.setCurrentText(self.config.get('stt_engine', 'google'))
         layout.addWidget(self.stt_combo, row, 1)
         row += 1
@@ -1670,6 +4943,40 @@ class SettingsDialog(QDialog):
         layout.addWidget(self.timeout_spinner, row, 1)
         row += 1
 
+        # TTS cache
+        audio_engine = getattr(self.parent(), 'audio_engine', None)
+        if audio_engine:
+            stats = audio_engine.cache.stats()
+            self.cache_label = QLabel(f"TTS Cache: {stats['hits']} hits / {stats['misses']} misses")
+            layout.addWidget(self.cache_label, row, 0)
+            clear_cache_btn = QPushButton("Clear TTS Cache")
+            clear_cache_btn.clicked.connect(self.clear_tts_cache)
+            layout.addWidget(clear_cache_btn, row, 1)
+            row += 1
+
+        # AI response cache
+        response_cache = get_gemini_client().cache
+        if response_cache:
+            stats = response_cache.stats()
+            self.response_cache_label = QLabel(
+                f"Response Cache: {stats['hit_rate']:.0%} hit rate, {stats['saved_seconds']:.1f} s saved"
+            )
+            layout.addWidget(self.response_cache_label, row, 0)
+            clear_response_btn = QPushButton("Clear Response Cache")
+            clear_response_btn.clicked.connect(self.clear_response_cache)
+            layout.addWidget(clear_response_btn, row, 1)
+            row += 1
+
+        # AI turns
+        turns = getattr(self.parent(), 'turns', None)
+        if turns:
+            stats = turns.stats()
+            layout.addWidget(QLabel(
+                f"AI Turns: queue depth {stats['queue_depth']}, {stats['dropped']} superseded, "
+                f"{stats['cancelled']} interrupted"
+            ), row, 0, 1, 2)
+            row += 1
+
         layout.setRowStretch(row, 1)
         return widget
 
@@ -1754,6 +5061,16 @@ class SettingsDialog(QDialog):
         else:
             self.murf_key_input.setEchoMode(QLineEdit.EchoMode.Password)
 
+    def clear_tts_cache(self):
+        """Clear cached Murf audio"""
+        self.parent().audio_engine.cache.clear()
+        self.cache_label.setText("TTS Cache: cleared")
+
+    def clear_response_cache(self):
+        """Forget cached AI replies"""
+        get_gemini_client().cache.clear()
+        self.response_cache_label.setText("Response Cache: cleared")
+
     def on_theme_changed(self, theme_name: str):
         """Handle theme change"""
         self.theme_changed = True
@@ -1780,22 +5097,504 @@ class SettingsDialog(QDialog):
         return self.config
 
 
+# ============================================================================
+# OFFLINE STUB SERVERS (for testing without network access)
+# ============================================================================
+
+class GeminiStubServer:
+    """Local HTTP server mimicking Gemini generateContent/streamGenerateContent"""
+
+    def __init__(self, chunk_delay: float = 0.05, port: int = 0):
+        self.chunk_delay = chunk_delay
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                words = stub.reply_for(body).split(" ")
+
+                if ":streamGenerateContent" in self.path:
+                    # Chunked SSE response, one event per word
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/event-stream")
+                    self.send_header("Transfer-Encoding", "chunked")
+                    self.end_headers()
+                    try:
+                        for i, word in enumerate(words):
+                            text = word if i == 0 else " " + word
+                            event = {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]}
+                            self._write_chunk(f"data: {json.dumps(event)}\r\n\r\n".encode("utf-8"))
+                            time.sleep(stub.chunk_delay)
+                        self._write_chunk(b"")
+                    except (BrokenPipeError, ConnectionResetError):
+                        self.close_connection = True  # Client cancelled mid-stream
+                else:
+                    result = {"candidates": [{"content": {"role": "model", "parts": [{"text": " ".join(words)}]}}]}
+                    payload = json.dumps(result).encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+
+            def _write_chunk(self, data: bytes):
+                self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1beta"
+
+    def reply_for(self, body: Dict) -> str:
+        """Build a canned reply echoing the last user message"""
+        prompt = ""
+        for content in body.get("contents", []):
+            if content.get("role", "user") == "user":
+                prompt = " ".join(p.get("text", "") for p in content.get("parts", []))
+        return (f"This is the offline Gemini stub. You asked: {prompt.strip()}. "
+                f"Streaming works one chunk at a time. Goodbye for now.")
+
+    def start(self):
+        """Serve requests on a daemon thread"""
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        """Shut the server down"""
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class DeepgramStubServer:
+    """Minimal local WebSocket server replaying canned Deepgram transcripts"""
+
+    GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+    def __init__(self, transcripts: Optional[List[str]] = None, frames_per_word: int = 10, port: int = 0):
+        self.transcripts = transcripts or ["hey astra what time is it", "open chrome"]
+        self.frames_per_word = frames_per_word
+        self.sessions = 0
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(("127.0.0.1", port))
+        self.sock.listen(4)
+        self.url = f"ws://127.0.0.1:{self.sock.getsockname()[1]}/v1/listen"
+        self.running = False
+
+    def start(self):
+        """Accept connections on a daemon thread"""
+        self.running = True
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        return self
+
+    def stop(self):
+        """Stop accepting connections"""
+        self.running = False
+        self.sock.close()
+
+    def _accept_loop(self):
+        while self.running:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                break
+            transcript = self.transcripts[self.sessions % len(self.transcripts)]
+            self.sessions += 1
+            threading.Thread(target=self._session, args=(conn, transcript), daemon=True).start()
+
+    def _session(self, conn, transcript: str):
+        """Handshake, then emit a growing interim transcript as audio arrives and a final on CloseStream"""
+        try:
+            request = b""
+            while b"\r\n\r\n" not in request:
+                request += conn.recv(1024)
+            key = re.search(rb"Sec-WebSocket-Key: *(\S+)", request, re.IGNORECASE).group(1).decode()
+            accept = base64.b64encode(hashlib.sha1((key + self.GUID).encode()).digest()).decode()
+            conn.sendall((
+                "HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+            ).encode())
+
+            words = transcript.split()
+            audio_frames = 0
+            while True:
+                opcode, data = self._recv_frame(conn)
+                if opcode == 0x2:  # Binary audio
+                    audio_frames += 1
+                    heard = min(len(words), audio_frames // self.frames_per_word)
+                    if audio_frames % self.frames_per_word == 0 and heard:
+                        self._send_result(conn, " ".join(words[:heard]), is_final=False)
+                elif opcode == 0x1 and b"CloseStream" in data:
+                    self._send_result(conn, transcript, is_final=True)
+                    self._send_frame(conn, 0x8, b"")
+                    break
+                elif opcode == 0x8:
+                    break
+                elif opcode == 0x9:  # Ping
+                    self._send_frame(conn, 0xA, data)
+        except Exception:
+            pass
+        finally:
+            conn.close()
+
+    def _send_result(self, conn, transcript: str, is_final: bool):
+        message = {
+            "type": "Results",
+            "channel": {"alternatives": [{"transcript": transcript, "confidence": 0.99}]},
+            "is_final": is_final,
+            "speech_final": is_final,
+        }
+        self._send_frame(conn, 0x1, json.dumps(message).encode("utf-8"))
+
+    @staticmethod
+    def _recv_exact(conn, size: int) -> bytes:
+        data = b""
+        while len(data) < size:
+            chunk = conn.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("client disconnected")
+            data += chunk
+        return data
+
+    def _recv_frame(self, conn):
+        """Read one (client-masked) WebSocket frame -> (opcode, payload)"""
+        first, second = self._recv_exact(conn, 2)
+        length = second & 0x7F
+        if length == 126:
+            length = struct.unpack(">H", self._recv_exact(conn, 2))[0]
+        elif length == 127:
+            length = struct.unpack(">Q", self._recv_exact(conn, 8))[0]
+        mask = self._recv_exact(conn, 4) if second & 0x80 else b""
+        data = self._recv_exact(conn, length)
+        if mask:
+            data = bytes(b ^ mask[i % 4] for i, b in enumerate(data))
+        return first & 0x0F, data
+
+    @staticmethod
+    def _send_frame(conn, opcode: int, data: bytes):
+        """Write one unmasked server frame"""
+        header = bytes([0x80 | opcode])
+        if len(data) < 126:
+            header += bytes([len(data)])
+        elif len(data) < 65536:
+            header += bytes([126]) + struct.pack(">H", len(data))
+        else:
+            header += bytes([127]) + struct.pack(">Q", len(data))
+        conn.sendall(header + data)
+
+
+def start_offline_stubs(config: Dict):
+    """Start local stub servers and point the config at them"""
+    gemini_stub = GeminiStubServer().start()
+    config['gemini_api_base'] = gemini_stub.url
+    config['gemini_use_sdk'] = False
+    config['gemini_api_key'] = config.get('gemini_api_key') or "offline-stub"
+    print(f"Offline stub: Gemini at {gemini_stub.url}")
+
+    deepgram_stub = DeepgramStubServer().start()
+    config['deepgram_url'] = deepgram_stub.url
+    config['deepgram_api_key'] = config.get('deepgram_api_key') or "offline-stub"
+    print(f"Offline stub: Deepgram at {deepgram_stub.url}")
+    return [gemini_stub, deepgram_stub]
+
+
+# ============================================================================
+# COMMAND-LINE TOOLS & BENCHMARKS
+# ============================================================================
+
+def _load_pcm16k(path: str) -> bytes:
+    """Read an audio file as 16 kHz 16-bit mono PCM"""
+    with sr.AudioFile(path) as source:
+        audio = sr.Recognizer().record(source)
+    return audio.get_raw_data(convert_rate=16000, convert_width=2)
+
+
+def enroll_wake_word(samples: int = 3):
+    """Record the wake word a few times and save the templates: python app.py --enroll-wake-word"""
+    spotter = WakeWordSpotter(CONFIG)
+    vad = VoiceActivityDetector(CONFIG)
+    recognizer = sr.Recognizer()
+    spotter.templates = []
+    with sr.Microphone(sample_rate=16000) as source:
+        recognizer.adjust_for_ambient_noise(source, duration=1)
+        for i in range(samples):
+            print(f"[{i + 1}/{samples}] Say your wake word (e.g. \"{CONFIG['wake_words'][1]}\")...")
+            audio = recognizer.listen(source, timeout=10, phrase_time_limit=3)
+            pcm = vad.trim(audio.get_raw_data(convert_rate=16000, convert_width=2))
+            if not pcm:
+                print("  No speech heard, skipping")
+                continue
+            spotter.enroll(pcm)
+    if spotter.templates:
+        spotter.save()
+        print(f"Saved {len(spotter.templates)} templates to {spotter.path} (threshold {spotter.threshold:.2f})")
+
+
+def benchmark_wake_word(data_dir: str):
+    """Report false-accept/false-reject rates and CPU cost: python app.py --benchmark-wake-word DIR
+
+    DIR/templates/*.wav - wake word recordings to enroll (optional if already enrolled)
+    DIR/positive/*.wav  - clips that contain the wake word
+    DIR/negative/*.wav  - background speech / noise without it
+    """
+    spotter = WakeWordSpotter(CONFIG)
+
+    def clips(name):
+        folder = os.path.join(data_dir, name)
+        if not os.path.isdir(folder):
+            return []
+        return [os.path.join(folder, f) for f in sorted(os.listdir(folder)) if f.lower().endswith(".wav")]
+
+    if clips("templates"):
+        spotter.templates = []
+        for path in clips("templates"):
+            spotter.enroll(_load_pcm16k(path))
+    if not spotter.ready:
+        print("No templates - add DIR/templates/*.wav or run --enroll-wake-word first")
+        return
+
+    results = {}
+    audio_seconds = 0.0
+    cpu_start = time.process_time()
+    for label in ("positive", "negative"):
+        fired = 0
+        paths = clips(label)
+        for path in paths:
+            pcm = _load_pcm16k(path)
+            audio_seconds += len(pcm) / 32000.0
+            fired += spotter.detect(pcm)[0]
+        results[label] = (fired, len(paths))
+    cpu_seconds = time.process_time() - cpu_start
+
+    accepts, negatives = results["negative"]
+    hits, positives = results["positive"]
+    print(f"Templates: {len(spotter.templates)}  threshold: {CONFIG.get('wake_word_threshold') or spotter.threshold:.2f}")
+    print(f"False accept rate: {accepts}/{negatives} = {accepts / max(negatives, 1):.1%}")
+    print(f"False reject rate: {positives - hits}/{positives} = {(positives - hits) / max(positives, 1):.1%}")
+    print(f"CPU: {cpu_seconds * 1000 / max(audio_seconds, 1e-9):.1f} ms per second of audio "
+          f"({audio_seconds:.1f} s audio)")
+
+
+def _legacy_intent(text: str) -> Tuple[Optional[str], Dict[str, str]]:
+    """The substring/uncompiled-regex routing CommandProcessor used before IntentRouter"""
+    text_lower = text.lower()
+
+    def first_group(patterns):
+        for pattern in patterns:
+            match = re.search(pattern, text, re.IGNORECASE)
+            if match:
+                return match.group(1)
+        return None
+
+    if any(word in text_lower for word in ["time", "clock"]):
+        return "time", {}
+    if any(word in text_lower for word in ["date", "today"]):
+        return "date", {}
+    if "open" in text_lower:
+        for app, aliases in APP_ALIASES.items():
+            if any(alias in text_lower for alias in aliases):
+                return "open", {"app": app}
+    if "remind" in text_lower or "reminder" in text_lower:
+        value = first_group([r"remind me to (.+)", r"reminder to (.+)", r"set a reminder (.+)"])
+        if value:
+            return "reminder", {"reminder": value}
+    if "note" in text_lower or "write" in text_lower:
+        value = first_group([r"write (?:a )?note (.+)", r"note (.+)", r"take (?:a )?note (.+)"])
+        if value:
+            return "note", {"note": value}
+    if "search" in text_lower or "google" in text_lower:
+        value = first_group([r"search for (.+)", r"google (.+)", r"search (.+)"])
+        if value:
+            return "search", {"search": value}
+    return None, {}
+
+
+def benchmark_intents(count: int = 100000):
+    """Compare legacy and compiled intent routing: python app.py --benchmark-intents [N]"""
+    rng = random.Random(42)
+    things = ["buy milk", "call mom today", "the weather in paris", "python decorators",
+              "check the oven", "meeting notes", "sometimes I forget", "my notebook"]
+    apps = [alias for aliases in APP_ALIASES.values() for alias in aliases]
+    templates = [
+        lambda: "what time is it",
+        lambda: "what's the date today",
+        lambda: f"open {rng.choice(apps)}",
+        lambda: f"please open {rng.choice(apps)} for me",
+        lambda: f"remind me to {rng.choice(things)}",
+        lambda: f"set a reminder {rng.choice(things)}",
+        lambda: f"take a note {rng.choice(things)}",
+        lambda: f"write note {rng.choice(things)}",
+        lambda: f"search for {rng.choice(things)}",
+        lambda: f"google {rng.choice(things)}",
+        lambda: f"tell me a joke about {rng.choice(things)}",
+        lambda: "sometimes I wonder what the meaning of life is",
+        lambda: "where did I leave my notebook",
+        lambda: "explain how a compiler works in simple terms",
+    ]
+    corpus = [rng.choice(templates)() for _ in range(count)]
+    router = IntentRouter()
+
+    timings = {}
+    results = {}
+    for name, route in (("legacy", _legacy_intent), ("compiled", router.route)):
+        started = time.perf_counter()
+        results[name] = [route(text) for text in corpus]
+        timings[name] = time.perf_counter() - started
+
+    print(f"Utterances: {count}")
+    for name, seconds in timings.items():
+        print(f"  {name:<9} {seconds:6.3f} s  {count / seconds:10.0f} utterances/s  "
+              f"{seconds * 1e6 / count:6.2f} us each")
+    print(f"Speedup: {timings['legacy'] / timings['compiled']:.2f}x")
+
+    differences = {}
+    for text, old, new in zip(corpus, results["legacy"], results["compiled"]):
+        if old[0] != new[0]:
+            differences.setdefault((old[0], new[0]), text)
+    print(f"Different intents: {sum(o[0] != n[0] for o, n in zip(results['legacy'], results['compiled']))}")
+    for (old, new), text in sorted(differences.items(), key=str):
+        print(f"  {old} -> {new}: {text!r}")
+
+
+# (utterance, expected intent or None for the LLM)
+SAMPLE_COMMAND_LOG = [
+    ("what time is it", "time"), ("what hour is it", "time"), ("how late is it", "time"),
+    ("open chrome", "open"), ("launch the browser", "open"), ("fire up spotify", "open"),
+    ("bring up the terminal", "open"), ("what's the date today", "date"), ("what day is it", "date"),
+    ("what month is it", "date"), ("remind me to call mom", "reminder"),
+    ("don't let me forget to water the plants", "reminder"), ("remember to buy eggs", "reminder"),
+    ("make sure i pay rent", "reminder"), ("take a note buy milk", "note"),
+    ("jot down the wifi password is hunter2", "note"), ("write down meeting moved to friday", "note"),
+    ("note that the meeting is at noon", "note"), ("search for python tutorials", "search"),
+    ("look up black holes", "search"), ("find information about the roman empire", "search"),
+    ("find me a good pizza place", "search"),
+    ("what is the meaning of life", None), ("tell me a joke", None), ("explain how vaccines work", None),
+    ("who won the world cup in 2018", None), ("write a poem about the sea", None),
+    ("how do i bake bread", None), ("can you help me with my homework", None),
+    ("what's the weather like", None), ("summarize the news", None),
+    ("what hour does the store close", None), ("what should i cook tonight", None), ("how are you", None),
+    ("make sure i understand recursion", None), ("alert me to any changes", None),
+    ("what month is christmas in", None), ("what day is it tomorrow", None),
+    ("how late is the pharmacy open", None), ("take down the website", None),
+    ("run the numbers for me", None), ("do you remember what i said", None),
+]
+
+
+def benchmark_classifier(log_path: Optional[str] = None):
+    """Classifier latency, LLM calls saved and misroutes on a replayed log: python app.py --benchmark-classifier [FILE]
+
+    FILE is either plain text (one utterance per line) or JSON/JSONL records with a "command" or "c"
+    field, such as astra_command_log.jsonl. Records may carry an "intent" label (null = LLM);
+    without labels only the routing is reported, not its precision.
+    """
+    utterances = SAMPLE_COMMAND_LOG
+    if log_path:
+        with open(log_path, "r", encoding="utf-8") as f:
+            raw = f.read()
+        try:
+            records = json.loads(raw)
+        except ValueError:
+            records = [line for line in raw.splitlines() if line.strip()]
+        utterances = []
+        for record in records if isinstance(records, list) else [records]:
+            if isinstance(record, str) and record.lstrip().startswith("{"):
+                record = json.loads(record)
+            if isinstance(record, dict):
+                utterances.append((record.get("command", record.get("c", "")), record.get("intent", "?")))
+            else:
+                utterances.append((record, "?"))
+
+    router = IntentRouter(APP_INDEX, CONFIG.get('app_match_threshold', 0.55))
+    classifier = IntentClassifier(APP_INDEX, CONFIG.get('intent_classifier_threshold', 0.6),
+                                  CONFIG.get('app_match_threshold', 0.55))
+    started = time.perf_counter()
+    classifier._build()
+    build_ms = (time.perf_counter() - started) * 1000
+
+    latencies = []
+    llm_before = saved = unlabelled = 0
+    routed = {}
+    misroutes = []  # (text, expected, got); got None = a command sent to the LLM
+    for text, expected in utterances:
+        if router.route(text)[0] is not None:
+            continue
+        llm_before += 1
+        started = time.perf_counter()
+        intent, slots = classifier.classify(text)
+        latencies.append(time.perf_counter() - started)
+        if intent is not None:
+            routed.setdefault(intent, []).append(text)
+        if expected == "?":
+            unlabelled += intent is not None
+        elif intent == expected:
+            saved += intent is not None
+        else:
+            misroutes.append((text, expected, intent))
+
+    latencies.sort()
+    print(f"Utterances: {len(utterances)}  keyword router misses (LLM calls before): {llm_before}")
+    print(f"Classifier build: {build_ms:.1f} ms  examples: {len(classifier.labels)}  features: {len(classifier.vocabulary)}")
+    if latencies:
+        print(f"Latency: mean {sum(latencies) / len(latencies) * 1e6:.0f} us  "
+              f"p50 {latencies[len(latencies) // 2] * 1e6:.0f} us  p99 {latencies[int(len(latencies) * 0.99)] * 1e6:.0f} us")
+    print(f"LLM calls saved (correctly routed): {saved}/{llm_before} = {saved / max(llm_before, 1):.1%}")
+    if unlabelled:
+        print(f"Routed without a label to check: {unlabelled}")
+    wrong = [m for m in misroutes if m[2] is not None]
+    print(f"Misroutes (wrong skill): {len(wrong)}  missed commands (sent to LLM): {len(misroutes) - len(wrong)}")
+    for text, expected, intent in misroutes:
+        print(f"  {text!r}: expected {expected or 'LLM'}, got {intent or 'LLM'}")
+    for intent, texts in sorted(routed.items()):
+        print(f"  {intent:<9} {len(texts):4}  e.g. {texts[0]!r}")
+
+
 # ============================================================================
 # MAIN ENTRY POINT
 # ============================================================================
 
 def main():
     """Main application entry point"""
+    # Command-line tools that don't need the UI
+    if "--enroll-wake-word" in sys.argv:
+        enroll_wake_word()
+        return
+    if "--benchmark-wake-word" in sys.argv:
+        benchmark_wake_word(sys.argv[sys.argv.index("--benchmark-wake-word") + 1])
+        return
+    if "--benchmark-intents" in sys.argv:
+        args = sys.argv[sys.argv.index("--benchmark-intents") + 1:]
+        benchmark_intents(int(args[0]) if args and args[0].isdigit() else 100000)
+        return
+    if "--benchmark-classifier" in sys.argv:
+        args = sys.argv[sys.argv.index("--benchmark-classifier") + 1:]
+        benchmark_classifier(args[0] if args and not args[0].startswith("--") else None)
+        return
+
+    # Optional local stub servers for offline testing: python app.py --offline-stub
+    stubs = start_offline_stubs(CONFIG) if "--offline-stub" in sys.argv else []
+
     app = QApplication(sys.argv)
 
     # Set application info
     app.setApplicationName("ASTRA")
     app.setOrganizationName("VoiceAI")
     app.setApplicationVersion("2.0.0")
+    app.aboutToQuit.connect(COMMAND_LOG.flush)
 
     # Create and show main window
     window = AstraWindow()
+    if window.async_engine is not None:
+        app.aboutToQuit.connect(window.async_engine.close)
     window.show()
+    PROFILER.mark("window shown")
+
+    # Heavy engines load after the first paint so the window is interactive immediately
+    QTimer.singleShot(0, lambda: (PROFILER.mark("first paint"), window.warm_up_engines()))
 
     # Display welcome message
     welcome = """